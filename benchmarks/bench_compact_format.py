@@ -0,0 +1,78 @@
+"""
+项目文件格式对比：JSON(.json)、加密JSON(.pack) 与紧凑格式(.easyb) 的体积和解析耗时
+
+用法: python benchmarks/bench_compact_format.py [--controls N]
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from design_canvas import DesignCanvas
+from project_manager import ProjectManager
+from ui_control import UIControl
+
+
+CONTROL_TYPES = ["QPushButton", "QLabel", "QLineEdit", "QCheckBox", "QComboBox", "QGroupBox"]
+
+
+def build_project(count):
+    """生成包含 count 个控件的项目数据"""
+    canvas = DesignCanvas()
+    rng = random.Random(0)
+    for i in range(count):
+        control = UIControl(rng.choice(CONTROL_TYPES), canvas)
+        control.x = rng.randint(0, 800)
+        control.y = rng.randint(0, 600)
+        control.text = f"控件{i}"
+        canvas.controls.append(control)
+    return ProjectManager.build_project_data(canvas)
+
+
+def measure(func, *args, repeat=3):
+    """返回多次运行中的最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目文件格式对比")
+    parser.add_argument("--controls", type=int, default=2000, help="控件数量")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    project_data = build_project(args.controls)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = []
+        for ext in (".json", ".pack", ".easyb"):
+            path = os.path.join(tmp_dir, "bench" + ext)
+            save_time = measure(ProjectManager.write_project_data, path, project_data)
+            load_time = measure(ProjectManager.read_project_data, path)
+            loaded = ProjectManager.read_project_data(path)
+            assert loaded["controls"] == json.loads(json.dumps(project_data["controls"])), f"{ext} 读回数据不一致"
+            results.append((ext, os.path.getsize(path), save_time, load_time))
+
+    base_size, base_load = results[0][1], results[0][3]
+    print(f"控件数量: {args.controls}")
+    print(f"{'格式':>8} {'体积(KB)':>10} {'体积比':>8} {'保存(s)':>10} {'解析(s)':>10} {'解析加速':>10}")
+    for ext, size, save_time, load_time in results:
+        print(f"{ext:>8} {size / 1024:>10.1f} {base_size / size:>7.1f}x {save_time:>10.4f} "
+              f"{load_time:>10.4f} {base_load / load_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+未加密JSON项目的编码识别性能测试：对比逐个编码整体试解码与单次检测
+
+语料包含UTF-8、带BOM的UTF-8、带编码标记的新文件、GBK（中文位于开头/末尾）以及Latin-1
+用法: python benchmarks/bench_encoding_detection.py [--controls N]
+"""
+import os
+import sys
+import time
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_manager import ProjectManager
+
+
+def legacy_decode(file_bytes):
+    """旧实现：按编码列表依次整体解码（仅用于对比）"""
+    for encoding in ["utf-8", "gbk", "gb2312", "utf-16", "latin1"]:
+        try:
+            return file_bytes.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return ""
+
+
+def build_project(count, chinese_at_end=False, title="编码测试"):
+    """生成包含 count 个控件的项目字典；chinese_at_end 时只有最后一个控件含中文"""
+    controls = []
+    for i in range(count):
+        text = f"button {i}" if chinese_at_end else f"按钮{i}"
+        if title != "编码测试":
+            text = f"bouton n°{i} été"
+        controls.append({"id": f"{i:08x}", "type": "QPushButton", "name": f"btn_{i:03d}",
+                         "text": text, "rect": [i % 800, i % 600, 80, 30], "parent_id": None})
+    if chinese_at_end and controls:
+        controls[-1]["text"] = "最后一个按钮"
+    return {"version": "1.1", "main_window": {"title": title}, "controls": controls}
+
+
+def build_corpus(count):
+    """生成 (名称, 文件字节, 主窗口标题) 列表"""
+    project = build_project(count)
+    late_project = build_project(count, chinese_at_end=True)
+    text = json.dumps(project, indent=4, ensure_ascii=False)
+    late_text = json.dumps(late_project, indent=4, ensure_ascii=False)
+    marked_text = json.dumps({"encoding": "utf-8", **project}, indent=4, ensure_ascii=False)
+    latin_text = json.dumps(build_project(count, title="Démo"), indent=4, ensure_ascii=False)
+    return [
+        ("UTF-8", text.encode("utf-8"), "编码测试"),
+        ("UTF-8 BOM", text.encode("utf-8-sig"), "编码测试"),
+        ("UTF-8 标记", marked_text.encode("utf-8"), "编码测试"),
+        ("GBK", text.encode("gbk"), "编码测试"),
+        ("GBK 中文在末尾", late_text.encode("gbk"), "编码测试"),
+        ("Latin-1", latin_text.encode("latin1"), "Démo"),
+    ]
+
+
+def measure(func, *args, repeat=5):
+    """返回多次运行中的最短耗时（秒）和结果"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="编码识别性能测试")
+    parser.add_argument("--controls", type=int, default=20000, help="每个项目的控件数量")
+    args = parser.parse_args()
+
+    print(f"{'语料':<16} {'大小(MB)':>10} {'旧实现(s)':>12} {'新实现(s)':>12} {'加速比':>8} {'旧可解析':>8}")
+    for name, file_bytes, title in build_corpus(args.controls):
+        legacy_time, legacy_text = measure(legacy_decode, file_bytes)
+        new_time, new_text = measure(ProjectManager.decode_text, file_bytes)
+        assert json.loads(new_text)["main_window"]["title"] == title, f"{name} 解码结果错误"
+        try:
+            legacy_ok = "是" if json.loads(legacy_text)["main_window"]["title"] == title else "否"
+        except ValueError:
+            legacy_ok = "否"
+        size = len(file_bytes) / (1024 * 1024)
+        print(f"{name:<16} {size:>10.2f} {legacy_time:>12.4f} {new_time:>12.4f} "
+              f"{legacy_time / new_time:>7.1f}x {legacy_ok:>8}")
+
+
+if __name__ == "__main__":
+    main()
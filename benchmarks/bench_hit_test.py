@@ -0,0 +1,68 @@
+"""
+画布点击命中测试性能：对比逐个遍历控件与空间索引查询
+
+用法: python benchmarks/bench_hit_test.py [--queries N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QRect
+
+from spatial_index import SpatialIndex
+
+
+def build_rects(count, seed=0):
+    """生成随机分布的控件矩形（画布约 4000x3000）"""
+    rng = random.Random(seed)
+    return [QRect(rng.randint(0, 3900), rng.randint(0, 2900), rng.randint(20, 200), rng.randint(20, 120))
+            for _ in range(count)]
+
+
+def linear_hit(rects, x, y):
+    """旧实现：从后往前逐个判断"""
+    for i in range(len(rects) - 1, -1, -1):
+        if rects[i].contains(x, y):
+            return i
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命中测试性能测试")
+    parser.add_argument("--queries", type=int, default=2000, help="每种规模的查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'控件数':>8} {'建索引(ms)':>12} {'遍历(us)':>12} {'索引(us)':>12} {'加速比':>10}")
+    for count in (100, 1000, 10000):
+        rects = build_rects(count)
+        start = time.perf_counter()
+        index = SpatialIndex()
+        for i, rect in enumerate(rects):
+            index.insert(i, i, rect)
+        build_time = time.perf_counter() - start
+
+        points = [(rng.randint(0, 4000), rng.randint(0, 3000)) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        expected = [linear_hit(rects, x, y) for x, y in points]
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = []
+        for x, y in points:
+            hits = index.query_point(x, y)
+            results.append(hits[0] if hits else None)
+        index_time = time.perf_counter() - start
+
+        assert results == expected, "索引查询结果与遍历结果不一致"
+        print(f"{count:>8} {build_time * 1000:>12.1f} {linear_time / len(points) * 1e6:>12.1f} "
+              f"{index_time / len(points) * 1e6:>12.1f} {linear_time / index_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
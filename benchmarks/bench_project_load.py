@@ -0,0 +1,89 @@
+"""
+项目加载耗时随控件数量的变化：验证加载为线性复杂度
+
+同时统计旧实现中每个控件构造时遍历画布生成默认名称的额外开销（O(n²)），
+以及延迟创建Widget（lazy）时的加载耗时
+用法: python benchmarks/bench_project_load.py [--sizes 100 1000 10000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from design_canvas import DesignCanvas
+from project_manager import ProjectManager
+from ui_control import UIControl
+
+
+CONTROL_TYPES = ["QPushButton", "QLabel", "QLineEdit", "QCheckBox", "QComboBox"]
+
+
+def write_project(file_path, count):
+    """生成包含 count 个控件的项目文件"""
+    canvas = DesignCanvas()
+    rng = random.Random(0)
+    for i in range(count):
+        control = UIControl(rng.choice(CONTROL_TYPES), canvas, name=f"控件_{i}")
+        control.rect.moveTo(rng.randint(0, 800), rng.randint(0, 600))
+        canvas.controls.append(control)
+    ProjectManager.write_project_data(file_path, ProjectManager.build_project_data(canvas))
+    canvas.deleteLater()
+
+
+def legacy_scan_cost(controls):
+    """旧实现中逐个构造控件时 get_control_count 的累计耗时"""
+    partial = SimpleNamespace(controls=[])
+    start = time.perf_counter()
+    for control in controls:
+        UIControl.get_control_count(partial, control.type)
+        partial.controls.append(control)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目加载复杂度测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="控件数量")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    print(f"{'控件数':>8} {'加载(s)':>10} {'每控件(ms)':>12} {'旧名称扫描(s)':>14} {'延迟加载(s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in args.sizes:
+            file_path = os.path.join(tmp_dir, f"bench_{count}.pack")
+            write_project(file_path, count)
+
+            canvas = DesignCanvas()
+            start = time.perf_counter()
+            assert ProjectManager.load_project(file_path, canvas, streaming=True)
+            elapsed = time.perf_counter() - start
+            assert len(canvas.controls) == count
+
+            scan = legacy_scan_cost(canvas.controls)
+            canvas.clear_canvas()
+            canvas.deleteLater()
+            app.processEvents()
+
+            # 延迟模式：画布未显示，只创建控件数据
+            canvas = DesignCanvas()
+            start = time.perf_counter()
+            assert ProjectManager.load_project(file_path, canvas, streaming=True, lazy=True)
+            lazy_elapsed = time.perf_counter() - start
+            assert len(canvas.pending_widgets) == count
+
+            print(f"{count:>8} {elapsed:>10.3f} {elapsed / count * 1000:>12.3f} {scan:>14.3f} {lazy_elapsed:>12.3f}")
+            canvas.clear_canvas()
+            canvas.deleteLater()
+            app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
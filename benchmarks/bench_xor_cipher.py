@@ -0,0 +1,68 @@
+"""
+.pack 文件XOR加解密性能测试：对比逐字节循环与按块整数运算
+
+用法: python benchmarks/bench_xor_cipher.py [--skip-legacy-above MB]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_manager import ProjectManager
+
+
+def legacy_xor_cipher(data, key):
+    """旧实现：逐字节XOR（仅用于对比）"""
+    key_len = len(key)
+    result = bytearray(len(data))
+    for i in range(len(data)):
+        result[i] = data[i] ^ key[i % key_len]
+    return bytes(result)
+
+
+def measure(func, *args, repeat=3):
+    """返回多次运行中的最短耗时（秒）和结果"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XOR加解密性能测试")
+    parser.add_argument("--skip-legacy-above", type=float, default=50,
+                        help="超过该大小(MB)时不再运行旧实现")
+    args = parser.parse_args()
+
+    key = ProjectManager.ENCRYPTION_KEY
+    sizes = [1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024]
+
+    print(f"{'大小':>10} {'旧实现(s)':>12} {'新实现(s)':>12} {'加速比':>10}")
+    for size in sizes:
+        data = os.urandom(size)
+        new_time, new_result = measure(ProjectManager._xor_cipher, data, key)
+
+        # 解密后必须还原
+        assert ProjectManager._xor_cipher(new_result, key) == data
+
+        if size <= args.skip_legacy_above * 1024 * 1024:
+            legacy_time, legacy_result = measure(legacy_xor_cipher, data, key, repeat=1)
+            assert legacy_result == new_result, "新旧实现结果不一致"
+            speedup = f"{legacy_time / new_time:.1f}x"
+            legacy_str = f"{legacy_time:.4f}"
+        else:
+            speedup = "-"
+            legacy_str = "-"
+
+        label = f"{size // 1024}KB" if size < 1024 * 1024 else f"{size // (1024 * 1024)}MB"
+        print(f"{label:>10} {legacy_str:>12} {new_time:>12.4f} {speedup:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,46 @@
-from PyQt5.QtWidgets import QWidget, QMessageBox, QMenu, QAction
-from PyQt5.QtCore import Qt, QPoint, QRect, pyqtSignal, QMimeData
-from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QDrag
+import time
+from PyQt5.QtWidgets import QWidget, QMessageBox, QMenu, QAction, QApplication
+from PyQt5.QtCore import Qt, QPoint, QRect, QLine, pyqtSignal, QMimeData, QTimer, QEvent
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QDrag, QRegion, QPixmap
 from ui_control import UIControl
 from main_window_props import MainWindowProperties
+from spatial_index import SpatialIndex, EdgeIndex
+from shared_stylesheet import SharedStyleSheet
+from theme_compiler import ThemeCompiler
+from theme_packs import ThemeRegistry
+
+
+def get_control_local_rect(control):
+    """
+    控件相对于主窗口内容区域左上角的矩形（带缓存）
+    
+    结果缓存在控件上，与主窗口的位置和标题栏高度无关；控件或其祖先的位置、大小、
+    父容器改变时由 UIControl.invalidate_rect_cache 清除整棵子树的缓存。
+    调用方不得修改返回的矩形。
+    
+    Args:
+        control: 要计算的控件（不能是主窗口控件）
+    
+    Returns:
+        QRect: 控件相对于主窗口内容区域的矩形
+    """
+    local_rect = control._local_rect_cache
+    if local_rect is None:
+        local_rect = QRect(control.rect)
+        parent = control.parent
+        if parent and parent.type != "MainWindow":
+            # 父容器的缓存先建立，保证已缓存控件的祖先一定已缓存
+            # 对于QTabWidget的子控件，不需要额外添加tab bar高度
+            # 因为self.rect已经是相对于QTabWidget整个控件的坐标（包括tab bar）
+            parent_rect = get_control_local_rect(parent)
+            local_rect.translate(parent_rect.x(), parent_rect.y())
+        control._local_rect_cache = local_rect
+    return local_rect
 
 
 def get_control_absolute_rect(control, main_window_props):
     """
-    递归计算控件的绝对坐标（相对于画布）
+    计算控件的绝对坐标（相对于画布）
     
     Args:
         control: 要计算的控件
@@ -28,39 +61,11 @@ def get_control_absolute_rect(control, main_window_props):
             main_window_props.height
         )
     
-    # 从控件自身的rect开始
-    abs_rect = QRect(control.rect)
-    
-    # 递归加上所有父容器的偏移
-    parent = control.parent
-    if parent:
-        current_control = control
-        while parent:
-            # 如果父容器是主窗口，停止递归并加上主窗口的偏移和标题栏高度
-            if parent.type == "MainWindow":
-                abs_rect.translate(
-                    main_window_props.x,
-                    main_window_props.y + main_window_props.title_height
-                )
-                break
-            
-            # 1. 先加上父容器的偏移
-            abs_rect.translate(parent.rect.x(), parent.rect.y())
-            
-            # 2. 对于QTabWidget的子控件，不需要额外添加tab bar高度
-            # 因为self.rect已经是相对于QTabWidget整个控件的坐标（包括tab bar）
-            
-            # 继续向上遍历
-            current_control = parent
-            parent = parent.parent
-    else:
-        # 如果控件没有父容器，直接加上主窗口的偏移和标题栏高度
-        abs_rect.translate(
-            main_window_props.x,
-            main_window_props.y + main_window_props.title_height
-        )
-    
-    return abs_rect
+    # 加上主窗口的偏移和标题栏高度
+    return get_control_local_rect(control).translated(
+        main_window_props.x,
+        main_window_props.y + main_window_props.title_height
+    )
 
 
 def get_control_parent_bounds(control, main_window_props):
@@ -108,12 +113,49 @@ def get_control_parent_bounds(control, main_window_props):
     return parent_abs_rect
 
 
+class FrameRateCounter:
+    """统计一次拖动中收到的鼠标事件数、实际处理的帧数和帧率"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start_time = time.perf_counter()
+        self.events = 0
+        self.frames = 0
+
+    def add_event(self):
+        self.events += 1
+
+    def add_frame(self):
+        self.frames += 1
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    @property
+    def fps(self):
+        elapsed = self.elapsed
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.frames} 帧 / {self.events} 个鼠标事件, "
+                f"{self.elapsed * 1000:.0f}ms, {self.fps:.1f} FPS")
+
+
 class SelectionOverlay(QWidget):
     """选中框和控制点覆盖层：确保始终显示在控件上方"""
     
+    HANDLE_DRAW_SIZE = 10
+    SIZE_LABEL_FONT = QFont("Arial", 10)
+    FPS_LABEL_FONT = QFont("Arial", 9)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
+        # 上次绘制的选中框、控制点、预览框等覆盖的区域，下次刷新时需要擦除
+        self.painted_region = QRegion()
         
         # 调试信息
         print(f"SelectionOverlay: 初始化完成, geometry={self.geometry()}, pos={self.pos()}")
@@ -135,14 +177,44 @@ class SelectionOverlay(QWidget):
             # 主窗口不绘制选中框
             pass
         
+        # 拖动中：只绘制虚影轮廓，控件本身在松开鼠标时才移动
+        if parent.drag_ghost_rects:
+            painter.setPen(QPen(QColor(100, 149, 237), 1, Qt.DashLine))
+            painter.setBrush(QColor(100, 149, 237, 30))
+            for ghost_rect in parent.drag_ghost_rects:
+                painter.drawRect(ghost_rect)
+            if parent.SHOW_DRAG_FPS:
+                painter.setPen(QColor(0, 0, 0))
+                painter.setFont(self.FPS_LABEL_FONT)
+                fps_text, text_pos, _ = self.fps_label_geometry()
+                painter.drawText(text_pos, fps_text)
         # 绘制控件选中框和控制点
-        if parent.selected_control and parent.main_window_props:
+        elif parent.is_multi_selection() and parent.main_window_props:
+            # 多选：每个控件画虚线框，控制点画在整组的外接矩形上
+            painter.setPen(QPen(QColor(100, 149, 237), 1, Qt.DashLine))
+            painter.setBrush(Qt.NoBrush)
+            for control in parent.selected_controls:
+                painter.drawRect(get_control_absolute_rect(control, parent.main_window_props))
+            self.draw_resize_handles(painter, parent.selection_bounds())
+        elif parent.selected_control and parent.main_window_props:
             # 统一使用 get_control_absolute_rect 计算绝对坐标，避免 mapTo 可能导致的坐标系问题
             abs_rect = get_control_absolute_rect(parent.selected_control, parent.main_window_props)
             
             # 绘制控制点
             self.draw_resize_handles(painter, abs_rect)
         
+        # 绘制对齐参考线
+        if parent.snap_guides:
+            painter.setPen(QPen(QColor(255, 0, 128), 1))
+            for guide in parent.snap_guides:
+                painter.drawLine(guide)
+        
+        # 绘制框选矩形
+        if parent.rubber_band_rect:
+            painter.setPen(QPen(QColor(100, 149, 237), 1, Qt.DashLine))
+            painter.setBrush(QColor(100, 149, 237, 40))
+            painter.drawRect(parent.rubber_band_rect)
+        
         # 绘制调整大小预览框
         if parent.resizing and parent.resize_current_rect:
             pen = QPen(QColor(0, 204, 102), 2, Qt.DashLine)
@@ -150,23 +222,11 @@ class SelectionOverlay(QWidget):
             painter.setBrush(QColor(0, 204, 102, 30))
             painter.drawRect(parent.resize_current_rect)
             
-            # 绘制宽高信息
-            width = parent.resize_current_rect.width()
-            height = parent.resize_current_rect.height()
-            size_text = f"{width} x {height}"
-            
-            # 设置文本样式
-            painter.setPen(QColor(0, 0, 0))
-            painter.setFont(QFont("Arial", 10))
-            
-            # 计算文本位置（在矩形左上方）
-            text_rect = painter.fontMetrics().boundingRect(size_text)
-            text_x = parent.resize_current_rect.x() - text_rect.width() - 5
-            text_y = parent.resize_current_rect.y() - 5
+            # 绘制宽高信息（在矩形左上方）
+            size_text, text_x, text_y, bg_rect = self.size_label_geometry(parent.resize_current_rect)
+            painter.setFont(self.SIZE_LABEL_FONT)
             
             # 绘制文本背景
-            bg_rect = QRect(text_x - 2, text_y - text_rect.height() + 2, 
-                           text_rect.width() + 4, text_rect.height() + 4)
             painter.setBrush(QColor(255, 255, 255, 200))
             painter.setPen(QPen(QColor(0, 0, 0), 1))
             painter.drawRect(bg_rect)
@@ -182,10 +242,87 @@ class SelectionOverlay(QWidget):
             painter.setPen(pen)
             painter.setBrush(QColor(0, 204, 102, 30))
             painter.drawRect(drawing_rect)
+        
+        # 记录已绘制的内容，下次刷新时擦除
+        self.painted_region = self.painted_region.united(self.decoration_region())
+    
+    def size_label_geometry(self, rect):
+        """调整大小预览的宽高文字: (文字, 文字x, 文字基线y, 背景矩形)"""
+        size_text = f"{rect.width()} x {rect.height()}"
+        text_rect = QFontMetrics(self.SIZE_LABEL_FONT).boundingRect(size_text)
+        text_x = rect.x() - text_rect.width() - 5
+        text_y = rect.y() - 5
+        bg_rect = QRect(text_x - 2, text_y - text_rect.height() + 2,
+                        text_rect.width() + 4, text_rect.height() + 4)
+        return size_text, text_x, text_y, bg_rect
+
+    def fps_label_geometry(self):
+        """拖动帧率文字: (文字, 基线位置, 覆盖的矩形)"""
+        parent = self.parent()
+        fps_text = f"{parent.drag_frame_counter.fps:.0f} FPS"
+        top_left = parent.drag_ghost_bounds.topLeft()
+        text_pos = QPoint(top_left.x(), top_left.y() - 4)
+        metrics = QFontMetrics(self.FPS_LABEL_FONT)
+        text_rect = metrics.boundingRect(fps_text).translated(text_pos)
+        # 帧率数字位数会变，留出余量
+        return fps_text, text_pos, text_rect.adjusted(-2, -2, metrics.boundingRect("000").width(), 2)
+
+    def handles_region(self, rect):
+        """8个控制点覆盖的区域"""
+        region = QRegion()
+        size = self.HANDLE_DRAW_SIZE + 2
+        for handle_pos in self.parent().get_resize_handles(rect).values():
+            region = region.united(QRect(handle_pos.x() - size // 2, handle_pos.y() - size // 2, size + 1, size + 1))
+        return region
+
+    @staticmethod
+    def outline_region(rect, margin=2):
+        """矩形边框（不含内部）覆盖的区域"""
+        outer = rect.adjusted(-margin, -margin, margin, margin)
+        if rect.width() <= 2 * margin or rect.height() <= 2 * margin:
+            return QRegion(outer)
+        return QRegion(outer).subtracted(QRegion(rect.adjusted(margin, margin, -margin, -margin)))
+
+    def decoration_region(self):
+        """当前状态下需要绘制的选中框、控制点、虚影和预览框覆盖的区域"""
+        parent = self.parent()
+        region = QRegion()
+        if not parent.main_window_props:
+            return region
+        if parent.drag_ghost_rects:
+            for ghost_rect in parent.drag_ghost_rects:
+                region = region.united(ghost_rect.adjusted(-1, -1, 1, 1))
+            if parent.SHOW_DRAG_FPS:
+                region = region.united(self.fps_label_geometry()[2])
+        elif parent.is_multi_selection():
+            for control in parent.selected_controls:
+                region = region.united(self.outline_region(get_control_absolute_rect(control, parent.main_window_props)))
+            region = region.united(self.handles_region(parent.selection_bounds()))
+        elif parent.selected_control:
+            region = region.united(self.handles_region(get_control_absolute_rect(parent.selected_control, parent.main_window_props)))
+
+        for guide in parent.snap_guides:
+            region = region.united(QRect(guide.p1(), guide.p2()).normalized().adjusted(-1, -1, 1, 1))
+        if parent.rubber_band_rect:
+            region = region.united(parent.rubber_band_rect.adjusted(-1, -1, 1, 1))
+        if parent.resizing and parent.resize_current_rect:
+            region = region.united(parent.resize_current_rect.adjusted(-2, -2, 2, 2))
+            region = region.united(self.size_label_geometry(parent.resize_current_rect)[3].adjusted(-1, -1, 1, 1))
+        if parent.drawing_mode:
+            region = region.united(QRect(parent.drawing_start_pos, parent.drawing_current_pos).normalized().adjusted(-2, -2, 2, 2))
+        return region
+
+    def refresh(self):
+        """只重绘上次绘制的区域和本次要绘制的区域"""
+        region = self.decoration_region()
+        dirty = self.painted_region.united(region)
+        self.painted_region = region
+        if not dirty.isEmpty():
+            self.update(dirty)
     
     def draw_resize_handles(self, painter, rect):
         """绘制控件的控制点（8个角和边的中点）"""
-        draw_size = 10
+        draw_size = self.HANDLE_DRAW_SIZE
         handle_color = QColor(100, 149, 237)
         
         # 定义8个控制点的位置
@@ -216,13 +353,18 @@ class SelectionOverlay(QWidget):
             
             # 优先级1: 检查是否点击了选中控件的控制点
             if parent.selected_control and parent.main_window_props:
-                abs_rect = get_control_absolute_rect(parent.selected_control, parent.main_window_props)
+                multi = parent.is_multi_selection()
+                if multi:
+                    abs_rect = parent.selection_bounds()
+                else:
+                    abs_rect = get_control_absolute_rect(parent.selected_control, parent.main_window_props)
                 handle = parent.get_resize_handle_at(event.pos(), abs_rect)
                 if handle:
                     print(f"SelectionOverlay: 检测到控制点={handle}，执行调整大小操作")
                     parent.resizing = True
                     parent.resize_handle = handle
-                    parent.resize_start_rect = parent.selected_control.rect
+                    # 多选时记录整组外接矩形（绝对坐标），按比例缩放所有控件
+                    parent.resize_start_rect = abs_rect if multi else parent.selected_control.rect
                     parent.resize_start_pos = event.pos()
                     parent.resize_current_rect = None
                     parent.update_selection_overlay()
@@ -261,25 +403,32 @@ class SelectionOverlay(QWidget):
             # 优先级3: 查找点击位置对应的控件并选中（合并了原有的移动逻辑）
             print(f"SelectionOverlay: 查找点击位置的控件，pos={event.pos()}")
             clicked_control = None
-            # 从后往前遍历，确保选中最上层的控件
-            for control in reversed(parent.controls):
+            # 空间索引返回包含该点的控件，最上层的在前
+            for control in parent.controls_at(event.pos()):
                 # 检查控件是否可见（包括父容器隐藏的情况）
                 if control.widget and not control.widget.isVisible():
                     continue
-                    
-                control_abs_rect = get_control_absolute_rect(control, parent.main_window_props)
-                if control_abs_rect.contains(event.pos()):
-                    clicked_control = control
-                    break
+                # 尚未创建Widget的控件按数据判断（如位于未选中的选项卡中）
+                if not control.widget and not parent.is_control_displayed(control):
+                    continue
+                clicked_control = control
+                break
             
             if clicked_control:
                 print(f"SelectionOverlay: 找到控件 {clicked_control.type}，执行选择和移动操作")
                 # 调用父控件的统一处理方法
-                parent.handle_control_click(clicked_control, event.pos(), event.button())
+                parent.handle_control_click(clicked_control, event.pos(), event.button(), event.modifiers())
                 # 接受事件，防止父控件DesignCanvas再处理一次
                 event.accept()
                 return
             
+            # 点击空白区域：开始框选（按住Ctrl/Shift时在现有选择上追加）
+            additive = bool(event.modifiers() & parent.MULTI_SELECT_MODIFIERS)
+            parent.start_rubber_band(event.pos(), additive)
+            if additive:
+                event.accept()
+                return
+            
             # 检查是否点击了主窗口区域
             window_rect = QRect(parent.main_window_props.x, parent.main_window_props.y, 
                                parent.main_window_props.width, parent.main_window_props.height + parent.main_window_props.title_height)
@@ -320,8 +469,8 @@ class SelectionOverlay(QWidget):
             parent.mouseMoveEvent(event)
             return
             
-        # 如果正在移动控件，传递给父控件处理
-        if parent.moving_control:
+        # 如果正在移动控件或框选，传递给父控件处理
+        if parent.moving_control or parent.rubber_band_origin is not None:
             parent.mouseMoveEvent(event)
             return
         
@@ -356,8 +505,8 @@ class SelectionOverlay(QWidget):
             parent.mouseReleaseEvent(event)
             return
             
-        # 如果正在移动控件，传递给父控件处理
-        if parent.moving_control:
+        # 如果正在移动控件或框选，传递给父控件处理
+        if parent.moving_control or parent.rubber_band_origin is not None:
             parent.mouseReleaseEvent(event)
             return
         
@@ -387,18 +536,47 @@ class DesignCanvas(QWidget):
     main_window_selected = pyqtSignal(object)  # 主窗口选中信号
     drawing_mode_changed = pyqtSignal(bool, str)  # 绘制模式改变信号 (是否绘制模式, 控件类型)
 
+    # 画布尺寸随主窗口范围变化：主窗口右下方留出的边距
+    CANVAS_MARGIN = 400
+    # 延迟创建Widget：可见区域外扩的预加载边距，以及每轮最多创建的Widget数
+    MATERIALIZE_MARGIN = 200
+    MATERIALIZE_BATCH = 200
+    # 多选：按住这些修饰键点击控件时切换选中状态，框选时追加到现有选择
+    MULTI_SELECT_MODIFIERS = Qt.ControlModifier | Qt.ShiftModifier
+    RUBBER_BAND_THRESHOLD = 3  # 拖动超过该距离才开始框选
+    # 拖动：鼠标事件合并到显示器刷新率处理（取不到刷新率时按该帧率），是否在虚影旁显示实时帧率
+    DRAG_DEFAULT_FPS = 60
+    SHOW_DRAG_FPS = False
+    # 吸附：网格线间距（与绘制的网格一致）、吸附到兄弟控件边线/中线的距离，按住 Alt 临时关闭吸附
+    GRID_STEP = 20
+    SNAP_ENABLED = True
+    SNAP_TOLERANCE = 6
+    SNAP_DISABLE_MODIFIER = Qt.AltModifier
+    MIN_CONTROL_SIZE = 10
+    # 共享样式表：只使用预设样式值的控件通过画布上的一份样式表设置样式（见 SharedStyleSheet）
+    # 默认关闭：实测 Qt 对每个控件重新polish的开销与逐个 setStyleSheet 相当，修改画布样式表时还要polish全部子控件
+    SHARED_STYLESHEET = False
+    CANVAS_STYLE = "background-color: #ffffff; border: 1px solid #cccccc;"
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setFixedSize(9999, 9999)
-        self.setStyleSheet("background-color: #ffffff; border: 1px solid #cccccc;")
+        self.shared_styles = SharedStyleSheet(self.CANVAS_STYLE) if self.SHARED_STYLESHEET else None
+        self.setStyleSheet(self.shared_styles.stylesheet if self.shared_styles else self.CANVAS_STYLE)
         self.setAcceptDrops(True)
+        self.setFocusPolicy(Qt.ClickFocus)  # 点击画布后接收方向键/Delete
         
         # 全局预设样式
         self.global_use_style = False  # 是否使用全局预设样式
         self.global_preset_style = "现代简约"  # 全局预设主题名称
+        ThemeRegistry.instance().themes_changed.connect(self.on_themes_changed)  # 主题包热重载
         
         # 状态管理
         self.controls = []
+        self.pending_widgets = {}  # 尚未创建Widget的控件 id -> control（延迟加载）
+        # 控件绝对矩形的空间索引（坐标相对于主窗口内容区域左上角，主窗口移动时无需更新）
+        self.spatial_index = SpatialIndex()
+        self._geometry_dirty = {}  # 几何变化待更新索引的子树根控件 id -> control
+        self.selected_controls = []  # 所有选中的控件（多选），selected_control 为其中的主选中控件
         self.selected_control = None
         self.drag_start_pos = QPoint(0, 0)
         self.dragging_control_type = None
@@ -408,6 +586,24 @@ class DesignCanvas(QWidget):
         self.move_start_pos = QPoint(0, 0)
         self.move_start_rect = None
         self.move_start_abs_rect = None  # 拖动开始时的控件绝对坐标
+        self.move_start_rects = {}  # 成组拖动：控件 id -> (控件, 拖动开始时的相对矩形)
+        self.drag_pending_pos = None  # 尚未处理的最新鼠标位置
+        self.drag_target_rects = []  # 松开鼠标时要提交的 [(控件, 相对矩形)]
+        self.drag_ghost_rects = []  # 拖动虚影（绝对坐标）
+        self.drag_ghost_bounds = QRect()
+        self.drag_frame_counter = FrameRateCounter()
+        self.last_drag_stats = None  # 最近一次拖动的统计信息
+        self.move_start_bounds = QRect()  # 拖动开始时被拖动控件的外接矩形（绝对坐标）
+        
+        # 吸附与对齐参考线
+        self.snap_guides = []  # 当前显示的参考线 [QLine]（绝对坐标）
+        self.snap_suspended = False  # 按住 Alt 时为 True
+        self._snap_edges = None  # 本次操作的兄弟控件边线索引 (x方向, y方向)
+        
+        # 框选状态
+        self.rubber_band_origin = None
+        self.rubber_band_rect = None
+        self.rubber_band_additive = False
         
         # 绘制模式状态
         self.drawing_mode = False
@@ -433,13 +629,34 @@ class DesignCanvas(QWidget):
         
         # 初始化选中框和控制点覆盖层
         self.selection_overlay = SelectionOverlay(self)
-        self.selection_overlay.setGeometry(0, 0, 9999, 9999)
         self.selection_overlay.raise_()  # 确保覆盖层始终在最上层
         
         # 启用右键菜单
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
+        # 延迟创建Widget：滚动/切换选项卡后合并为一次检查
+        self._materialize_timer = QTimer(self)
+        self._materialize_timer.setSingleShot(True)
+        self._materialize_timer.setInterval(30)
+        self._materialize_timer.timeout.connect(self.materialize_visible_controls)
+        self._watched_viewport = None
+        
+        # 主窗口背景（外框、标题栏、网格）位图缓存
+        self._background_key = None
+        self._background_pixmap = None
+        self._background_offset = QPoint(0, 0)
+        
+        # 画布尺寸按主窗口范围确定（不再固定为超大尺寸）
+        self.update_canvas_size()
+        
+        # 拖动：每帧最多处理一次鼠标移动
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.timeout.connect(self.process_drag_frame)
+        # 选中控件时确保其Widget已创建（先于属性面板等其他接收者执行）
+        self.control_selected.connect(self.materialize_control)
+
     def clear_canvas(self):
         """清空画布"""
         # 移除所有控件的Widget
@@ -449,6 +666,9 @@ class DesignCanvas(QWidget):
                 control.widget.deleteLater()
         
         self.controls.clear()
+        self.pending_widgets.clear()
+        self.spatial_index.clear()
+        self._geometry_dirty.clear()
         self.selected_control = None
         self.update()
         self.control_deleted.emit(None) # None 表示全部删除
@@ -462,6 +682,196 @@ class DesignCanvas(QWidget):
         self.main_window_control.parent = None  # 主窗口没有父容器
         self.main_window_control.children = []
 
+    # -------------------------- 空间索引 --------------------------
+    def invalidate_control_geometry(self, control):
+        """控件位置/大小/父容器改变后调用，其整棵子树在下次查询前重新登记到空间索引"""
+        if control is None or control.type == "MainWindow":
+            return
+        self._geometry_dirty[control.id] = control
+
+    def remove_control_from_index(self, control):
+        self.spatial_index.remove(control.id)
+        self._geometry_dirty.pop(control.id, None)
+
+    def flush_spatial_index(self):
+        """把几何变化的控件子树更新到空间索引"""
+        if not self._geometry_dirty:
+            return
+        index = self.spatial_index
+        updates = []
+        seen = set()
+        stack = list(self._geometry_dirty.values())
+        self._geometry_dirty.clear()
+        while stack:
+            control = stack.pop()
+            if control.id in seen:
+                continue
+            seen.add(control.id)
+            updates.append(control)
+            stack.extend(control.children)
+
+        # 新控件按在 self.controls 中的顺序登记，使索引中的层叠顺序与绘制顺序一致
+        # 新控件总是追加到列表末尾，因此从后往前找即可
+        new_ids = {control.id for control in updates if control.id not in index}
+        if new_ids:
+            found = []
+            for control in reversed(self.controls):
+                if control.id in new_ids:
+                    found.append(control)
+                    if len(found) == len(new_ids):
+                        break
+            for control in reversed(found):
+                index.insert(control.id, control, get_control_local_rect(control))
+        for control in updates:
+            if control.id in index and control.id not in new_ids:
+                index.insert(control.id, control, get_control_local_rect(control))
+
+    def controls_at(self, pos):
+        """返回绝对矩形包含该点的控件，最上层的在前"""
+        self.flush_spatial_index()
+        props = self.main_window_props
+        return self.spatial_index.query_point(pos.x() - props.x, pos.y() - props.y - props.title_height)
+
+    def controls_in_rect(self, rect):
+        """返回绝对矩形与该矩形相交的控件，最上层的在前"""
+        self.flush_spatial_index()
+        props = self.main_window_props
+        return self.spatial_index.query_rect(rect.translated(-props.x, -(props.y + props.title_height)))
+
+    # -------------------------- 延迟创建Widget --------------------------
+    def defer_widget(self, control):
+        """登记控件，等其进入可见区域、所在选项卡被选中或被选中时再创建Widget"""
+        self.pending_widgets[control.id] = control
+        self.invalidate_control_geometry(control)
+
+    def schedule_materialize(self, *args):
+        """合并多次触发，稍后检查可见区域内待创建的控件
+
+        计时器已在运行时不重新计时，否则连续到达的加载批次或滚动事件会一直推迟创建，
+        直到全部结束才显示控件
+        """
+        if self.pending_widgets and not self._materialize_timer.isActive():
+            self._materialize_timer.start()
+
+    def visible_canvas_rect(self):
+        """画布在滚动区域中当前可见的部分（画布坐标）"""
+        viewport = self.parentWidget()
+        if viewport is None:
+            return self.rect()
+        return QRect(self.mapFrom(viewport, QPoint(0, 0)), viewport.size()).intersected(self.rect())
+
+    def is_control_displayed(self, control):
+        """根据数据判断控件是否会显示（自身及父容器可见，且位于父选项卡的当前页）"""
+        child = control
+        parent = control.parent
+        while parent and parent.type != "MainWindow":
+            if not parent.visible:
+                return False
+            if parent.type == "QTabWidget":
+                current = parent.widget.currentIndex() if parent.widget else parent.tab_current_index
+                if child.parent_tab_index >= 0 and child.parent_tab_index != current:
+                    return False
+            child = parent
+            parent = parent.parent
+        return control.visible
+
+    def materialize_control(self, control):
+        """立即创建控件的Widget（父容器的Widget会先被创建）"""
+        if control is None or control.id not in self.pending_widgets:
+            return
+        parent = control.parent
+        if parent and parent.type != "MainWindow":
+            self.materialize_control(parent)
+        del self.pending_widgets[control.id]
+        control.create_widget()
+        if not control.widget:
+            return
+        if control.type == "QTabWidget":
+            # 切换选项卡后创建新页面中的控件
+            control.widget.currentChanged.connect(self.schedule_materialize)
+
+        # create_widget 会把Widget提到最上层，这里恢复到后面兄弟控件之下，保持原有层叠顺序
+        siblings = parent.children if parent else self.main_window_control.children
+        if control in siblings:
+            for sibling in siblings[siblings.index(control) + 1:]:
+                if sibling.widget and sibling.widget.parentWidget() is control.widget.parentWidget():
+                    control.widget.stackUnder(sibling.widget)
+                    break
+        self.selection_overlay.raise_()
+
+    def materialize_visible_controls(self):
+        """为可见区域内待创建的控件创建Widget，每轮数量有限，剩余的下一轮继续"""
+        if not self.pending_widgets or not self.isVisible():
+            return
+        margin = self.MATERIALIZE_MARGIN
+        area = self.visible_canvas_rect().adjusted(-margin, -margin, margin, margin)
+        batch = []
+        for control in reversed(self.controls_in_rect(area)):
+            if control.id in self.pending_widgets and self.is_control_displayed(control):
+                batch.append(control)
+                if len(batch) >= self.MATERIALIZE_BATCH:
+                    break
+        for control in batch:
+            self.materialize_control(control)
+        if len(batch) >= self.MATERIALIZE_BATCH:
+            self.schedule_materialize()
+
+    def showEvent(self, event):
+        """显示时创建可见区域内的控件，并监听滚动区域视口的尺寸变化"""
+        super().showEvent(event)
+        viewport = self.parentWidget()
+        if viewport is not None and viewport is not self._watched_viewport:
+            viewport.installEventFilter(self)
+            self._watched_viewport = viewport
+        self.schedule_materialize()
+
+    def moveEvent(self, event):
+        """滚动时画布在视口中移动"""
+        super().moveEvent(event)
+        self.schedule_materialize()
+
+    def eventFilter(self, obj, event):
+        if obj is self._watched_viewport and event.type() == QEvent.Resize:
+            self.update_canvas_size()
+            self.schedule_materialize()
+        return super().eventFilter(obj, event)
+
+    # -------------------------- 画布尺寸 --------------------------
+    def required_canvas_size(self, extra_rect=None):
+        """画布需要的尺寸：主窗口、顶层控件（及调整中的预览框）范围加边距，且不小于滚动区域的视口"""
+        props = self.main_window_props
+        right = props.x + props.width
+        bottom = props.y + props.height + props.title_height
+        # 子控件位于父容器内，只需考虑顶层控件（如主窗口缩小后留在窗口外的控件）
+        for control in self.main_window_control.children:
+            rect = get_control_absolute_rect(control, props)
+            right = max(right, rect.right() + 1)
+            bottom = max(bottom, rect.bottom() + 1)
+        if extra_rect is not None:
+            right = max(right, extra_rect.right() + 1)
+            bottom = max(bottom, extra_rect.bottom() + 1)
+        width = right + self.CANVAS_MARGIN
+        height = bottom + self.CANVAS_MARGIN
+        viewport = self.parentWidget()
+        if viewport is not None:
+            width = max(width, viewport.width())
+            height = max(height, viewport.height())
+        return width, height
+
+    def update_canvas_size(self, extra_rect=None, shrink=True):
+        """按主窗口范围调整画布尺寸（覆盖层随之调整）；shrink=False 时只增大不缩小"""
+        width, height = self.required_canvas_size(extra_rect)
+        if not shrink:
+            width = max(width, self.width())
+            height = max(height, self.height())
+        if (width, height) != (self.width(), self.height()):
+            self.setFixedSize(width, height)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.selection_overlay.setGeometry(self.rect())
+        self.schedule_materialize()
+
     def set_global_preset_style(self, use_style, preset_style):
         """设置全局预设样式
         
@@ -477,49 +887,127 @@ class DesignCanvas(QWidget):
         # 应用全局预设样式到所有控件
         self.apply_global_preset_style_to_all()
 
-    def apply_global_preset_style_to_all(self):
-        """将全局预设主题应用到所有控件（只覆盖未被手动设置的属性）"""
+    def apply_global_preset_style_to_all(self, control_types=None):
+        """将全局预设主题应用到所有控件（只覆盖未被手动设置的属性）
+
+        先为所有控件计算新的样式值，只有样式实际改变的控件才重新应用样式（不再重复更新特有属性），
+        期间暂停画布重绘，结束后只重绘一次。control_types 不为 None 时只处理这些类型的控件
+        """
         if not self.global_use_style:
             print(f"[全局样式] 未启用，跳过应用")
             return
         
-        theme_data = UIControl.PRESET_THEMES.get(self.global_preset_style, {})
-        if not theme_data:
+        if not UIControl.PRESET_THEMES.get(self.global_preset_style):
             print(f"[全局样式] 未找到预设主题: {self.global_preset_style}")
             return
         
-        print(f"[全局样式] 应用主题 '{self.global_preset_style}' 到 {len(self.controls)} 个控件")
-        
+        start_time = time.perf_counter()
+
+        # 1. 计算新的样式值，记录样式改变的控件
+        changed = []
+        undefined_types = set()
         for control in self.controls:
-            # 根据控件类型获取对应的样式数据
-            control_type = control.type
-            preset_data = theme_data.get(control_type, {})
-            
-            if not preset_data:
-                print(f"[全局样式] 控件类型 {control_type} 在主题中未定义样式，跳过")
+            if control_types is not None and control.type not in control_types:
                 continue
-            
+            # 根据控件类型获取对应的样式记录
+            theme_style = UIControl.theme_style(self.global_preset_style, control.type)
+            if theme_style is None:
+                undefined_types.add(control.type)
+                continue
+
             # 应用预设样式值（只覆盖未被手动设置的属性）
-            if "bg_color" in preset_data and "bg_color" not in control.custom_properties:
-                control.bg_color = QColor(preset_data["bg_color"])
-            if "fg_color" in preset_data and "fg_color" not in control.custom_properties:
-                control.fg_color = QColor(preset_data["fg_color"])
-            if "font_size" in preset_data and "font_size" not in control.custom_properties:
-                control.font.setPointSize(preset_data["font_size"])
-            if "bold" in preset_data and "bold" not in control.custom_properties:
-                control.font.setBold(preset_data["bold"])
-            if "visual_style" in preset_data and "visual_style" not in control.custom_properties:
-                control.visual_style = preset_data["visual_style"]
-            if "border_radius" in preset_data and "border_radius" not in control.custom_properties:
-                control.border_radius = preset_data["border_radius"]
-            if "border_width" in preset_data and "border_width" not in control.custom_properties:
-                control.border_width = preset_data["border_width"]
-            if "border_color" in preset_data and "border_color" not in control.custom_properties:
-                control.border_color = QColor(preset_data["border_color"])
-            
-            # 更新控件
-            control.update_widget()
-            print(f"[全局样式] 已应用到控件 {control.name} ({control_type})")
+            if ThemeCompiler.apply_theme(control, theme_style):
+                changed.append(control)
+
+        # 2. 暂停重绘，只重新应用改变了的样式（尚未创建Widget的控件在创建时应用）
+        self.setUpdatesEnabled(False)
+        try:
+            # 先生成共享样式表，各控件更新时直接套用共享样式而不必各自设置样式表
+            self.apply_shared_styles()
+            for control in changed:
+                control.invalidate(UIControl.DIRTY_STYLE)
+                control.flush_updates()
+        finally:
+            self.setUpdatesEnabled(True)
+
+        elapsed = (time.perf_counter() - start_time) * 1000
+        print(f"[全局样式] 应用主题 '{self.global_preset_style}'：{len(self.controls)} 个控件中 "
+              f"{len(changed)} 个样式改变，耗时 {elapsed:.1f}ms")
+        if undefined_types:
+            print(f"[全局样式] 以下控件类型在主题中未定义样式，已跳过: {', '.join(sorted(undefined_types))}")
+
+    def on_themes_changed(self, changes):
+        """主题包重新加载后，只重新应用样式改变了的控件类型
+
+        单独选择了该主题的控件重新应用主题（保留手动设置的属性）；主题包被删除时，
+        控件和全局的预设风格改为"自定义"，已应用的样式值保持不变
+        """
+        changed = []
+        for control in self.controls:
+            control_types = changes.get(control.preset_style)
+            if not control_types or control.type not in control_types:
+                continue
+            if control.preset_style not in UIControl.PRESET_THEMES:
+                control.preset_style = "自定义"
+                continue
+            theme_style = UIControl.theme_style(control.preset_style, control.type)
+            if theme_style and ThemeCompiler.apply_theme(control, theme_style):
+                changed.append(control)
+        if changed:
+            self.setUpdatesEnabled(False)
+            try:
+                self.apply_shared_styles()
+                for control in changed:
+                    control.invalidate(UIControl.DIRTY_STYLE)
+                    control.flush_updates()
+            finally:
+                self.setUpdatesEnabled(True)
+            print(f"[主题包] 重新应用了 {len(changed)} 个单独设置预设风格的控件")
+
+        if self.global_preset_style in changes and self.global_preset_style not in UIControl.PRESET_THEMES:
+            self.global_preset_style = "自定义"
+            return
+        control_types = changes.get(self.global_preset_style)
+        if self.global_use_style and control_types and UIControl.PRESET_THEMES.get(self.global_preset_style):
+            self.apply_global_preset_style_to_all(control_types)
+
+    def apply_shared_styles(self):
+        """重新生成画布的共享样式表：先给所有只使用预设样式值的控件设置动态属性，
+        再一次性设置画布样式表，所有控件只重新polish一次"""
+        if self.shared_styles is None:
+            return
+        controls = [control for control in self.controls if control.use_style and not control.custom_properties]
+        stylesheet = self.shared_styles.rebuild(controls)
+        property_name = SharedStyleSheet.PROPERTY_NAME
+        stylesheet_changed = self.styleSheet() != stylesheet
+
+        suspend = self.updatesEnabled()  # 在批量操作中调用时由调用方负责恢复重绘
+        if suspend:
+            self.setUpdatesEnabled(False)
+        try:
+            # 1. 设置动态属性（此时还不触发polish）
+            repolish = []
+            for control in controls:
+                widget = control.widget
+                if not widget:
+                    continue
+                style_class = self.shared_styles.class_for(control.style_key())
+                if widget.property(property_name) != style_class:
+                    widget.setProperty(property_name, style_class)
+                    repolish.append(widget)
+            # 2. 一次性设置画布样式表（所有子控件随之重新polish）
+            if stylesheet_changed:
+                self.setStyleSheet(stylesheet)
+            # 3. 清除控件自己的样式表；画布样式表未变时只需重新polish属性改变的控件
+            for control in controls:
+                if control.widget and control.widget.styleSheet():
+                    control.widget.setStyleSheet("")
+            if not stylesheet_changed:
+                for widget in repolish:
+                    SharedStyleSheet.repolish(widget)
+        finally:
+            if suspend:
+                self.setUpdatesEnabled(True)
 
     def get_global_preset_style(self):
         """获取全局预设样式设置
@@ -534,14 +1022,51 @@ class DesignCanvas(QWidget):
             self.selection_overlay.raise_()
 
     def paintEvent(self, event):
-        """绘制画布：显示网格背景、主窗口"""
+        """绘制画布：显示网格背景、主窗口（主窗口背景使用缓存的位图）"""
         super().paintEvent(event)
         painter = QPainter(self)
-        
-        # 绘制主窗口模拟区域（包含标题栏和内容区）
-        # height 属性现在代表内容区高度，所以总高度需要加上标题栏高度
-        window_rect = QRect(self.main_window_props.x, self.main_window_props.y, 
-                          self.main_window_props.width, self.main_window_props.height + self.main_window_props.title_height)
+        pixmap, offset = self.window_background_pixmap()
+        painter.drawPixmap(self.main_window_props.x + offset.x(), self.main_window_props.y + offset.y(), pixmap)
+
+    def window_background_key(self):
+        """主窗口背景位图的缓存键：影响外框、标题栏和网格绘制的所有属性"""
+        props = self.main_window_props
+        return (props.width, props.height, props.title_height, props.title, props.use_style,
+                props.bg_color.rgba(), props.title_color.rgba(), props.title_text_color.rgba(),
+                props.grid_enabled, props.grid_spacing, props.grid_start_x, props.grid_start_y,
+                props.grid_color.rgba(), self.devicePixelRatioF())
+
+    def window_background_pixmap(self):
+        """返回主窗口背景位图及其左上角相对于主窗口左上角的偏移，属性变化时才重新绘制"""
+        key = self.window_background_key()
+        if key == self._background_key and self._background_pixmap is not None:
+            return self._background_pixmap, self._background_offset
+
+        props = self.main_window_props
+        window_rect = QRect(0, 0, props.width, props.height + props.title_height)
+        # 外框画笔宽度为2，网格按起始偏移可能超出窗口右下边缘
+        bounds = window_rect
+        if props.grid_enabled:
+            bounds = bounds.united(QRect(props.grid_start_x, props.title_height + props.grid_start_y,
+                                         props.width, props.height))
+        bounds = bounds.adjusted(-2, -2, 2, 2)
+
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, round(bounds.width() * ratio)), max(1, round(bounds.height() * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.translate(-bounds.x(), -bounds.y())
+        self.draw_window_background(painter, window_rect)
+        painter.end()
+
+        self._background_key = key
+        self._background_pixmap = pixmap
+        self._background_offset = bounds.topLeft()
+        return pixmap, self._background_offset
+
+    def draw_window_background(self, painter, window_rect):
+        """绘制主窗口模拟区域（外框、背景、网格和标题栏），window_rect 为包含标题栏的整个窗口"""
         painter.setPen(QPen(QColor(0, 0, 0), 2))
         
         # 根据是否启用样式绘制背景
@@ -554,8 +1079,8 @@ class DesignCanvas(QWidget):
             self.draw_window_grid(painter, window_rect)
         
         # 绘制窗口标题栏
-        title_rect = QRect(self.main_window_props.x, self.main_window_props.y, 
-                          self.main_window_props.width, self.main_window_props.title_height)
+        title_rect = QRect(window_rect.x(), window_rect.y(), 
+                          window_rect.width(), self.main_window_props.title_height)
         
         if self.main_window_props.use_style:
             # 启用样式：使用自定义标题栏颜色
@@ -596,11 +1121,11 @@ class DesignCanvas(QWidget):
         content_height = self.main_window_props.height
         
         # 绘制垂直线
-        for x in range(content_x, content_x + content_width, 20):
+        for x in range(content_x, content_x + content_width, self.GRID_STEP):
             painter.drawLine(x, content_y, x, content_y + content_height)
         
         # 绘制水平线
-        for y in range(content_y, content_y + content_height, 20):
+        for y in range(content_y, content_y + content_height, self.GRID_STEP):
             painter.drawLine(content_x, y, content_x + content_width, y)
 
     def get_resize_handles(self, rect):
@@ -649,6 +1174,205 @@ class DesignCanvas(QWidget):
         
         self.setCursor(cursor_map.get(handle, Qt.ArrowCursor))
 
+    # -------------------------- 多选 --------------------------
+    @property
+    def selected_control(self):
+        """主选中控件（属性面板显示的控件）"""
+        return self._selected_control
+
+    @selected_control.setter
+    def selected_control(self, control):
+        # 直接设置主选中控件时回到单选
+        self._selected_control = control
+        self.selected_controls = [control] if control else []
+
+    def set_selection(self, controls, primary=None):
+        """设置选中的控件列表，primary 为主选中控件（默认取最后一个）"""
+        controls = list(dict.fromkeys(control for control in controls if control))
+        if primary is None or primary not in controls:
+            primary = controls[-1] if controls else None
+        self._selected_control = primary
+        self.selected_controls = controls
+
+    def is_multi_selection(self):
+        return len(self.selected_controls) > 1
+
+    def selection_roots(self):
+        """选中控件中祖先未被选中的那些（移动/缩放时子控件随父容器一起变化）"""
+        selected = {control.id for control in self.selected_controls}
+        roots = []
+        for control in self.selected_controls:
+            parent = control.parent
+            while parent and parent.id not in selected:
+                parent = parent.parent
+            if not parent:
+                roots.append(control)
+        return roots
+
+    def selection_bounds(self):
+        """所有选中控件的外接矩形（绝对坐标）"""
+        bounds = QRect()
+        for control in self.selected_controls:
+            bounds = bounds.united(get_control_absolute_rect(control, self.main_window_props))
+        return bounds
+
+    def get_move_limits(self, control, size):
+        """控件（左上角相对坐标）在父容器内可移动的范围: (min_x, min_y, max_x, max_y)"""
+        parent = control.parent
+        if parent and parent.type != "MainWindow":
+            parent_bounds = get_control_parent_bounds(control, self.main_window_props)
+            parent_abs_rect = get_control_absolute_rect(parent, self.main_window_props)
+            return (parent_bounds.x() - parent_abs_rect.x(),
+                    parent_bounds.y() - parent_abs_rect.y(),
+                    parent_bounds.right() - parent_abs_rect.x() - size.width(),
+                    parent_bounds.bottom() - parent_abs_rect.y() - size.height())
+        return (0, 0,
+                self.main_window_props.width - size.width(),
+                self.main_window_props.height - size.height())
+
+    def apply_geometry_batch(self, changes):
+        """一次性应用多个控件的新矩形 [(控件, 相对矩形)]，期间暂停画布重绘，最后只刷新一次"""
+        if not changes:
+            return
+        self.setUpdatesEnabled(False)
+        try:
+            for control, rect in changes:
+                control.rect = QRect(rect)
+                control.update_geometry()
+        finally:
+            self.setUpdatesEnabled(True)
+        self.update_selection_overlay()
+
+    def apply_absolute_rects(self, targets):
+        """一次几何事务：把 [(控件, 目标绝对矩形)] 转换为相对父容器的矩形（限制在父容器内），
+        每个控件只设置一次几何，最后只刷新一次属性面板"""
+        changes = []
+        for control, abs_target in targets:
+            abs_rect = get_control_absolute_rect(control, self.main_window_props)
+            # 父容器坐标原点的绝对位置
+            origin = abs_rect.topLeft() - control.rect.topLeft()
+            rect = QRect(abs_target.x() - origin.x(), abs_target.y() - origin.y(),
+                         max(self.MIN_CONTROL_SIZE, abs_target.width()),
+                         max(self.MIN_CONTROL_SIZE, abs_target.height()))
+            min_x, min_y, max_x, max_y = self.get_move_limits(control, rect.size())
+            rect.moveTo(max(min_x, min(rect.x(), max_x)), max(min_y, min(rect.y(), max_y)))
+            if rect != control.rect:
+                changes.append((control, rect))
+        self.apply_geometry_batch(changes)
+        if changes:
+            self.control_selected.emit(self.selected_control)
+        return len(changes)
+
+    def _selection_abs_rects(self):
+        return [(control, get_control_absolute_rect(control, self.main_window_props))
+                for control in self.selection_roots() if not control.locked]
+
+    def nudge_selection(self, dx, dy):
+        """方向键微调：选中控件整体平移"""
+        self.apply_absolute_rects([(control, rect.translated(dx, dy)) for control, rect in self._selection_abs_rects()])
+
+    def align_selection(self, mode):
+        """对齐选中控件到整组外接矩形: left / right / top / bottom / h_center / v_center"""
+        items = self._selection_abs_rects()
+        if len(items) < 2:
+            return
+        bounds = QRect()
+        for _, rect in items:
+            bounds = bounds.united(rect)
+        targets = []
+        for control, rect in items:
+            if mode == "left":
+                rect.moveLeft(bounds.left())
+            elif mode == "right":
+                rect.moveRight(bounds.right())
+            elif mode == "top":
+                rect.moveTop(bounds.top())
+            elif mode == "bottom":
+                rect.moveBottom(bounds.bottom())
+            elif mode == "h_center":
+                rect.moveLeft(bounds.x() + (bounds.width() - rect.width()) // 2)
+            elif mode == "v_center":
+                rect.moveTop(bounds.y() + (bounds.height() - rect.height()) // 2)
+            targets.append((control, rect))
+        self.apply_absolute_rects(targets)
+
+    def distribute_selection(self, orientation):
+        """等间距分布选中控件（首尾控件不动）: horizontal / vertical"""
+        items = self._selection_abs_rects()
+        if len(items) < 3:
+            return
+        horizontal = orientation == "horizontal"
+        items.sort(key=lambda item: item[1].x() if horizontal else item[1].y())
+        first, last = items[0][1], items[-1][1]
+        if horizontal:
+            span = last.x() + last.width() - first.x()
+            total = sum(rect.width() for _, rect in items)
+        else:
+            span = last.y() + last.height() - first.y()
+            total = sum(rect.height() for _, rect in items)
+        gap = (span - total) / (len(items) - 1)
+        position = first.x() if horizontal else first.y()
+        targets = []
+        for index, (control, rect) in enumerate(items):
+            if horizontal:
+                rect.moveLeft(round(position))
+                position += rect.width() + gap
+            else:
+                rect.moveTop(round(position))
+                position += rect.height() + gap
+            targets.append((control, rect))
+        self.apply_absolute_rects(targets)
+
+    def match_selection_size(self, mode):
+        """统一尺寸为主选中控件的尺寸: width / height / both"""
+        primary = self.selected_control
+        if not primary or not self.is_multi_selection():
+            return
+        size = primary.rect.size()
+        targets = []
+        for control, rect in self._selection_abs_rects():
+            if mode in ("width", "both"):
+                rect.setWidth(size.width())
+            if mode in ("height", "both"):
+                rect.setHeight(size.height())
+            targets.append((control, rect))
+        self.apply_absolute_rects(targets)
+
+    def start_rubber_band(self, pos, additive=False):
+        """在空白处按下鼠标：记录框选起点"""
+        self.rubber_band_origin = QPoint(pos)
+        self.rubber_band_rect = None
+        self.rubber_band_additive = additive
+
+    def finish_rubber_band(self):
+        """松开鼠标：选中完全位于框选矩形内的可见控件"""
+        band = self.rubber_band_rect
+        self.rubber_band_origin = None
+        self.rubber_band_rect = None
+        if band is None:
+            # 没有拖动，只是单击空白处
+            self.update_selection_overlay()
+            return
+
+        hits = []
+        for control in reversed(self.controls_in_rect(band)):
+            if control.widget and not control.widget.isVisible():
+                continue
+            if not control.widget and not self.is_control_displayed(control):
+                continue
+            if band.contains(get_control_absolute_rect(control, self.main_window_props)):
+                hits.append(control)
+
+        if self.rubber_band_additive:
+            hits = self.selected_controls + hits
+        self.set_selection(hits)
+        if self.selected_control:
+            self.main_window_selected_flag = False
+            self.main_window_selected.emit(None)
+        self.update_control_list()
+        self.control_selected.emit(self.selected_control)
+        self.update_selection_overlay()
+
     # -------------------------- 鼠标事件处理 --------------------------
     def update_selection_overlay(self):
         """更新选中框和控制点覆盖层的状态"""
@@ -656,15 +1380,29 @@ class DesignCanvas(QWidget):
         if hasattr(self, 'selection_overlay'):
             self.selection_overlay.raise_()
             self.selection_overlay.setAttribute(Qt.WA_TransparentForMouseEvents, False)
-            self.selection_overlay.update()
+            self.selection_overlay.refresh()
 
-    def handle_control_click(self, control, event_pos, button):
-        """处理控件点击事件：选中控件并准备拖动"""
+    def handle_control_click(self, control, event_pos, button, modifiers=Qt.NoModifier):
+        """处理控件点击事件：选中控件并准备拖动（Ctrl/Shift+点击切换多选）"""
         if not control:
             return
 
         # 选中控件
-        self.selected_control = control
+        if modifiers & self.MULTI_SELECT_MODIFIERS:
+            if control in self.selected_controls:
+                # 再次点击已选中的控件：取消选中，不开始拖动
+                remaining = [c for c in self.selected_controls if c is not control]
+                self.set_selection(remaining)
+                self.update_control_list()
+                self.control_selected.emit(self.selected_control)
+                self.update_selection_overlay()
+                return
+            self.set_selection(self.selected_controls + [control], primary=control)
+        elif control in self.selected_controls and self.is_multi_selection():
+            # 点击多选中的某个控件：保持多选，准备成组拖动
+            self.set_selection(self.selected_controls, primary=control)
+        else:
+            self.selected_control = control
         self.main_window_selected_flag = False
         self.update_control_list()
         self.control_selected.emit(control)
@@ -677,6 +1415,14 @@ class DesignCanvas(QWidget):
             self.move_start_pos = event_pos
             self.move_start_rect = QRect(control.rect)
             self.move_start_abs_rect = get_control_absolute_rect(control, self.main_window_props)
+            self.move_start_rects = {c.id: (c, QRect(c.rect)) for c in self.selection_roots()}
+            self.move_start_bounds = QRect()
+            for c, _ in self.move_start_rects.values():
+                self.move_start_bounds = self.move_start_bounds.united(get_control_absolute_rect(c, self.main_window_props))
+            self._snap_edges = None
+            self.drag_pending_pos = None
+            self.drag_target_rects = []
+            self.drag_frame_counter.reset()
 
     def mousePressEvent(self, event):
         """鼠标按下：检测是否点击控制点、主窗口或开始绘制"""
@@ -715,61 +1461,40 @@ class DesignCanvas(QWidget):
             self.update_selection_overlay()
             return
         
+        if self.rubber_band_origin is not None and event.buttons() == Qt.LeftButton:
+            # 更新框选矩形
+            if (self.rubber_band_rect is not None
+                    or (event.pos() - self.rubber_band_origin).manhattanLength() >= self.RUBBER_BAND_THRESHOLD):
+                self.rubber_band_rect = QRect(self.rubber_band_origin, event.pos()).normalized()
+                self.update_selection_overlay()
+            return
+        
+        self.snap_suspended = bool(event.modifiers() & self.SNAP_DISABLE_MODIFIER)
+        
         if self.resizing and event.buttons() == Qt.LeftButton and self.selected_control:
             # 更新调整大小预览
-            self.update_resize_preview(event.pos())
+            if self.is_multi_selection():
+                self.update_group_resize_preview(event.pos())
+            else:
+                self.update_resize_preview(event.pos())
+            if self.selected_control.type == "MainWindow" and self.resize_current_rect:
+                # 拖大主窗口时画布随之增大
+                self.update_canvas_size(self.resize_current_rect, shrink=False)
             self.update_selection_overlay()
             return
         
-        if self.moving_control and event.buttons() == Qt.LeftButton and self.selected_control:
-            delta = event.pos() - self.move_start_pos
-            
-            new_rect = QRect(self.move_start_rect)
-            new_rect.translate(delta)
-            
-            parent = self.selected_control.parent
-            
-            if parent and parent.type == "MainWindow":
-                parent_bounds = get_control_parent_bounds(self.selected_control, self.main_window_props)
-                
-                min_x = 0
-                min_y = 0
-                max_x = self.main_window_props.width - new_rect.width()
-                max_y = self.main_window_props.height - new_rect.height()
-                
-                new_rect.moveLeft(max(min_x, min(new_rect.left(), max_x)))
-                new_rect.moveTop(max(min_y, min(new_rect.top(), max_y)))
-            elif parent:
-                parent_bounds = get_control_parent_bounds(self.selected_control, self.main_window_props)
-                parent_abs_rect = get_control_absolute_rect(parent, self.main_window_props)
-                
-                min_x = parent_bounds.x() - parent_abs_rect.x()
-                min_y = parent_bounds.y() - parent_abs_rect.y()
-                max_x = parent_bounds.right() - parent_abs_rect.x() - new_rect.width()
-                max_y = parent_bounds.bottom() - parent_abs_rect.y() - new_rect.height()
-                
-                new_rect.moveLeft(max(min_x, min(new_rect.left(), max_x)))
-                new_rect.moveTop(max(min_y, min(new_rect.top(), max_y)))
-            else:
-                max_x = self.main_window_props.width - new_rect.width()
-                max_y = self.main_window_props.height - new_rect.height()
-                
-                new_rect.moveLeft(max(0, min(new_rect.left(), max_x)))
-                new_rect.moveTop(max(0, min(new_rect.top(), max_y)))
-            
-            self.selected_control.rect = new_rect
-            self.selected_control.update_geometry()
-            
-            # 触发信号更新属性面板
-            self.control_selected.emit(self.selected_control)
-            
-            self.update_selection_overlay()
+        if self.moving_control and event.buttons() == Qt.LeftButton and self.move_start_rects:
+            # 拖动（单选或多选）：合并鼠标事件，每帧只更新一次虚影
+            self.queue_drag(event.pos())
             return
         
         # 更新鼠标光标（当鼠标悬停在控制点上时）
         if self.selected_control and not self.resizing:
-            # 使用辅助函数计算绝对坐标（支持多层嵌套）
-            abs_rect = get_control_absolute_rect(self.selected_control, self.main_window_props)
+            # 使用辅助函数计算绝对坐标（支持多层嵌套），多选时使用整组外接矩形
+            if self.is_multi_selection():
+                abs_rect = self.selection_bounds()
+            else:
+                abs_rect = get_control_absolute_rect(self.selected_control, self.main_window_props)
             
             handle = self.get_resize_handle_at(event.pos(), abs_rect)
             self.update_cursor_for_handle(handle)
@@ -783,9 +1508,16 @@ class DesignCanvas(QWidget):
             self.finish_drawing()
             return
         
+        if self.rubber_band_origin is not None and event.button() == Qt.LeftButton:
+            # 完成框选
+            self.finish_rubber_band()
+            return
+        
         if self.resizing and event.button() == Qt.LeftButton:
             # 完成调整大小
-            if self.selected_control:
+            if self.is_multi_selection():
+                self.finish_group_resizing()
+            elif self.selected_control:
                 # 检查是否是MainWindow控件或父布局属于MainWindow
                 if (self.selected_control.type == "MainWindow" or 
                     (self.selected_control.parent and self.selected_control.parent.type == "MainWindow")):
@@ -796,16 +1528,25 @@ class DesignCanvas(QWidget):
         
         if self.moving_control and event.button() == Qt.LeftButton:
             # 完成移动控件
-            self.moving_control = False
-            self.move_start_pos = QPoint(0, 0)
-            self.move_start_rect = None
-            self.control_selected.emit(self.selected_control)
+            self.finish_drag()
             return
     
     def keyPressEvent(self, event):
-        """键盘按键事件：处理删除快捷键"""
+        """键盘按键事件：处理删除快捷键，方向键微调选中控件位置（按住Shift时移动一个网格）"""
         if event.key() == Qt.Key_Delete and not self.drawing_mode:
             self.delete_selected_control()
+        arrows = {
+            Qt.Key_Left: (-1, 0),
+            Qt.Key_Right: (1, 0),
+            Qt.Key_Up: (0, -1),
+            Qt.Key_Down: (0, 1),
+        }
+        if event.key() in arrows and self.selected_controls and not self.drawing_mode:
+            step = self.GRID_STEP if event.modifiers() & Qt.ShiftModifier else 1
+            dx, dy = arrows[event.key()]
+            self.nudge_selection(dx * step, dy * step)
+            event.accept()
+            return
         super().keyPressEvent(event)
     
     def update_resize_preview(self, pos):
@@ -864,6 +1605,10 @@ class DesignCanvas(QWidget):
             new_left = max(min_x, abs_original.left() + delta.x())
             abs_new_rect.setLeft(new_left)
         
+        # 吸附到兄弟控件边线或网格（主窗口本身不吸附）
+        if self.selected_control.type != "MainWindow":
+            abs_new_rect = self.snap_resize_rect(abs_new_rect, self.resize_handle)
+        
         # 确保最小尺寸
         min_size = 20
         if abs_new_rect.width() < min_size:
@@ -911,6 +1656,261 @@ class DesignCanvas(QWidget):
         # 更新预览矩形
         self.resize_current_rect = abs_new_rect
     
+    # -------------------------- 吸附与对齐参考线 --------------------------
+    def snap_active(self):
+        return self.SNAP_ENABLED and not self.snap_suspended
+
+    def snap_edge_indexes(self):
+        """本次操作的边线索引：主选中控件的兄弟控件（不含被选中的控件）及父容器内容区域的边线和中线
+
+        每次拖动/调整大小开始后第一次用到时建立，之后每次鼠标移动只做二分查找。
+        """
+        if self._snap_edges is not None:
+            return self._snap_edges
+        x_index, y_index = EdgeIndex(), EdgeIndex()
+        control = self.selected_control
+        parent = control.parent if control else None
+        if parent and parent.type != "MainWindow":
+            rects = [get_control_parent_bounds(control, self.main_window_props)]
+            siblings = parent.children
+        else:
+            rects = [get_control_parent_bounds(None, self.main_window_props)]
+            siblings = self.main_window_control.children
+        selected = {c.id for c in self.selected_controls}
+        for sibling in siblings:
+            if sibling.id in selected:
+                continue
+            if sibling.widget and not sibling.widget.isVisible():
+                continue
+            if not sibling.widget and not self.is_control_displayed(sibling):
+                continue
+            rects.append(get_control_absolute_rect(sibling, self.main_window_props))
+        for rect in rects:
+            left, top = rect.x(), rect.y()
+            right, bottom = left + rect.width(), top + rect.height()
+            for value in (left, (left + right) // 2, right):
+                x_index.add(value, top, bottom)
+            for value in (top, (top + bottom) // 2, bottom):
+                y_index.add(value, left, right)
+        self._snap_edges = (x_index.build(), y_index.build())
+        return self._snap_edges
+
+    def grid_origin(self):
+        """网格线起点（绝对坐标），未启用网格时返回 None"""
+        props = self.main_window_props
+        if not props.grid_enabled:
+            return None
+        return QPoint(props.x + props.grid_start_x, props.y + props.title_height + props.grid_start_y)
+
+    def snap_axis(self, index, edges, grid_origin):
+        """在一个方向上吸附：edges 为移动中矩形在该方向上的候选边线坐标
+
+        优先吸附到最近的兄弟控件边线（返回偏移量和命中的边线），否则把第一条边线吸附到网格。
+        """
+        best = None
+        for edge in edges:
+            hit = index.nearest(edge, self.SNAP_TOLERANCE)
+            if hit and (best is None or abs(hit[0] - edge) < abs(best[0])):
+                best = (hit[0] - edge, hit)
+        if best:
+            return best
+        if grid_origin is not None:
+            edge = edges[0]
+            step = self.GRID_STEP
+            return grid_origin + round((edge - grid_origin) / step) * step - edge, None
+        return 0, None
+
+    def snap_guide_lines(self, rect, x_hit, y_hit):
+        """根据命中的边线生成参考线，线段覆盖目标边线和吸附后的矩形"""
+        guides = []
+        if x_hit:
+            x, lo, hi = x_hit
+            guides.append(QLine(x, min(lo, rect.top()), x, max(hi, rect.y() + rect.height())))
+        if y_hit:
+            y, lo, hi = y_hit
+            guides.append(QLine(min(lo, rect.left()), y, max(hi, rect.x() + rect.width()), y))
+        return guides
+
+    def snap_move_delta(self, dx, dy):
+        """拖动吸附：调整偏移量使被拖动控件的边线/中线对齐兄弟控件或网格"""
+        if not self.snap_active() or not self.move_start_bounds.isValid():
+            self.snap_guides = []
+            return dx, dy
+        x_index, y_index = self.snap_edge_indexes()
+        origin = self.grid_origin()
+        moving = self.move_start_bounds.translated(dx, dy)
+        left, top = moving.x(), moving.y()
+        right, bottom = left + moving.width(), top + moving.height()
+        offset_x, x_hit = self.snap_axis(x_index, (left, (left + right) // 2, right),
+                                         origin.x() if origin else None)
+        offset_y, y_hit = self.snap_axis(y_index, (top, (top + bottom) // 2, bottom),
+                                         origin.y() if origin else None)
+        self.snap_guides = self.snap_guide_lines(moving.translated(offset_x, offset_y), x_hit, y_hit)
+        return dx + offset_x, dy + offset_y
+
+    def snap_resize_rect(self, rect, handle):
+        """调整大小吸附：只移动被拖动的边（绝对坐标矩形）"""
+        if not self.snap_active():
+            self.snap_guides = []
+            return rect
+        x_index, y_index = self.snap_edge_indexes()
+        origin = self.grid_origin()
+        left, top = rect.x(), rect.y()
+        right, bottom = left + rect.width(), top + rect.height()
+        x_hit = y_hit = None
+        if 'left' in handle:
+            offset, x_hit = self.snap_axis(x_index, (left,), origin.x() if origin else None)
+            left += offset
+        elif 'right' in handle:
+            offset, x_hit = self.snap_axis(x_index, (right,), origin.x() if origin else None)
+            right += offset
+        if 'top' in handle:
+            offset, y_hit = self.snap_axis(y_index, (top,), origin.y() if origin else None)
+            top += offset
+        elif 'bottom' in handle:
+            offset, y_hit = self.snap_axis(y_index, (bottom,), origin.y() if origin else None)
+            bottom += offset
+        snapped = QRect(left, top, right - left, bottom - top)
+        self.snap_guides = self.snap_guide_lines(snapped, x_hit, y_hit)
+        return snapped
+
+    def end_snapping(self):
+        """操作结束：清除参考线和边线索引"""
+        self.snap_guides = []
+        self._snap_edges = None
+
+    # -------------------------- 拖动移动 --------------------------
+    def drag_frame_interval(self):
+        """每帧间隔（毫秒），按显示器刷新率计算"""
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen else 0
+        if not rate or rate <= 0:
+            rate = self.DRAG_DEFAULT_FPS
+        return max(1, int(1000 / rate))
+
+    def queue_drag(self, pos, modifiers=None):
+        """记录最新的鼠标位置，在下一帧统一处理"""
+        if modifiers is not None:
+            self.snap_suspended = bool(modifiers & self.SNAP_DISABLE_MODIFIER)
+        self.drag_frame_counter.add_event()
+        self.drag_pending_pos = QPoint(pos)
+        if not self._drag_timer.isActive():
+            self._drag_timer.start(self.drag_frame_interval())
+
+    def compute_drag_rects(self, pos):
+        """根据鼠标位置计算拖动的控件的新相对矩形，偏移量限制在每个控件都不越出父容器的范围内"""
+        delta = pos - self.move_start_pos
+        dx, dy = self.snap_move_delta(delta.x(), delta.y())
+        for control, start_rect in self.move_start_rects.values():
+            min_x, min_y, max_x, max_y = self.get_move_limits(control, start_rect.size())
+            dx = max(min_x - start_rect.x(), min(dx, max_x - start_rect.x()))
+            dy = max(min_y - start_rect.y(), min(dy, max_y - start_rect.y()))
+        return [(control, start_rect.translated(dx, dy)) for control, start_rect in self.move_start_rects.values()]
+
+    def process_drag_frame(self):
+        """处理一帧拖动：只移动虚影，覆盖层只重绘虚影新旧位置"""
+        if self.drag_pending_pos is None or not self.moving_control:
+            return
+        pos = self.drag_pending_pos
+        self.drag_pending_pos = None
+        self.drag_frame_counter.add_frame()
+
+        self.drag_target_rects = self.compute_drag_rects(pos)
+        ghosts = []
+        for control, rect in self.drag_target_rects:
+            # 控件尚未移动，虚影 = 当前绝对矩形 + 相对矩形的变化量
+            offset = rect.topLeft() - control.rect.topLeft()
+            ghosts.append(get_control_absolute_rect(control, self.main_window_props).translated(offset))
+        self.drag_ghost_rects = ghosts
+        self.drag_ghost_bounds = QRect()
+        for ghost_rect in ghosts:
+            self.drag_ghost_bounds = self.drag_ghost_bounds.united(ghost_rect)
+        # 只重绘虚影新旧位置（第一帧还包括原位置上的控制点）
+        self.selection_overlay.refresh()
+
+    def finish_drag(self):
+        """结束拖动：处理最后一个鼠标位置，一次性提交控件的真实位置，并刷新一次属性面板"""
+        self._drag_timer.stop()
+        if self.drag_pending_pos is not None:
+            self.process_drag_frame()
+        changes = [(control, rect) for control, rect in self.drag_target_rects if rect != control.rect]
+        if self.drag_frame_counter.frames:
+            self.last_drag_stats = {
+                "events": self.drag_frame_counter.events,
+                "frames": self.drag_frame_counter.frames,
+                "elapsed": self.drag_frame_counter.elapsed,
+                "fps": self.drag_frame_counter.fps,
+            }
+            print(f"[拖动] {len(self.move_start_rects)} 个控件, {self.drag_frame_counter.summary()}")
+        self.end_snapping()
+
+        self.moving_control = False
+        self.move_start_pos = QPoint(0, 0)
+        self.move_start_rect = None
+        self.move_start_rects = {}
+        self.drag_target_rects = []
+        self.drag_ghost_rects = []
+        self.drag_ghost_bounds = QRect()
+        self.apply_geometry_batch(changes)
+        self.update_selection_overlay()
+        self.control_selected.emit(self.selected_control)
+
+    def update_group_resize_preview(self, pos):
+        """多选时更新整组外接矩形的调整大小预览（限制在主窗口内容区域内）"""
+        start = self.resize_start_rect
+        if not start:
+            return
+        delta = pos - self.resize_start_pos
+        min_size = 20
+        left, top, right, bottom = start.left(), start.top(), start.right(), start.bottom()
+        handle = self.resize_handle
+        if 'left' in handle:
+            left = min(left + delta.x(), right - min_size)
+        if 'right' in handle:
+            right = max(right + delta.x(), left + min_size)
+        if 'top' in handle:
+            top = min(top + delta.y(), bottom - min_size)
+        if 'bottom' in handle:
+            bottom = max(bottom + delta.y(), top + min_size)
+        preview = self.snap_resize_rect(QRect(QPoint(left, top), QPoint(right, bottom)), handle)
+        content = get_control_parent_bounds(None, self.main_window_props)
+        self.resize_current_rect = preview.intersected(content.united(start))
+
+    def finish_group_resizing(self):
+        """多选调整大小完成：每个控件按整组外接矩形的缩放比例调整位置和大小，一次性应用"""
+        old = self.resize_start_rect
+        new = self.resize_current_rect
+        changes = []
+        if old and new and old.width() > 0 and old.height() > 0:
+            scale_x = new.width() / old.width()
+            scale_y = new.height() / old.height()
+            for control in self.selection_roots():
+                abs_rect = get_control_absolute_rect(control, self.main_window_props)
+                # 父容器坐标原点的绝对位置
+                origin = abs_rect.topLeft() - control.rect.topLeft()
+                rect = QRect(
+                    new.x() + round((abs_rect.x() - old.x()) * scale_x) - origin.x(),
+                    new.y() + round((abs_rect.y() - old.y()) * scale_y) - origin.y(),
+                    max(self.MIN_CONTROL_SIZE, round(abs_rect.width() * scale_x)),
+                    max(self.MIN_CONTROL_SIZE, round(abs_rect.height() * scale_y))
+                )
+                min_x, min_y, max_x, max_y = self.get_move_limits(control, rect.size())
+                rect.moveTo(max(min_x, min(rect.x(), max_x)), max(min_y, min(rect.y(), max_y)))
+                changes.append((control, rect))
+        self.apply_geometry_batch(changes)
+
+        # 属性面板只刷新一次
+        if changes:
+            self.control_selected.emit(self.selected_control)
+        self.end_snapping()
+        self.resizing = False
+        self.resize_handle = None
+        self.resize_start_rect = None
+        self.resize_start_pos = QPoint(0, 0)
+        self.resize_current_rect = None
+        self.setCursor(Qt.ArrowCursor)
+        self.update_selection_overlay()
+
     def finish_resizing_main_window(self):
         """处理MainWindow的调整大小，或父布局属于MainWindow的控件的调整大小"""
         if not self.selected_control or not self.resize_current_rect:
@@ -919,6 +1919,7 @@ class DesignCanvas(QWidget):
             self.resize_start_rect = None
             self.resize_start_pos = QPoint(0, 0)
             self.resize_current_rect = None
+            self.end_snapping()
             self.setCursor(Qt.ArrowCursor)
             self.update_selection_overlay()
             return
@@ -968,6 +1969,7 @@ class DesignCanvas(QWidget):
         self.control_selected.emit(self.selected_control)
         
         # 重置调整大小状态
+        self.end_snapping()
         self.resizing = False
         self.resize_handle = None
         self.resize_start_rect = None
@@ -979,6 +1981,7 @@ class DesignCanvas(QWidget):
         
         # 更新画布
         self.update_selection_overlay()
+        self.update_canvas_size()
         self.update()
     
     def finish_resizing(self):
@@ -989,6 +1992,7 @@ class DesignCanvas(QWidget):
             self.resize_start_rect = None
             self.resize_start_pos = QPoint(0, 0)
             self.resize_current_rect = None
+            self.end_snapping()
             self.setCursor(Qt.ArrowCursor)
             self.update_selection_overlay()
             return
@@ -1025,6 +2029,7 @@ class DesignCanvas(QWidget):
         self.control_selected.emit(self.selected_control)
         
         # 重置调整大小状态
+        self.end_snapping()
         self.resizing = False
         self.resize_handle = None
         self.resize_start_rect = None
@@ -1054,28 +2059,9 @@ class DesignCanvas(QWidget):
         
         # 应用全局预设主题（如果启用）
         if self.global_use_style:
-            theme_data = UIControl.PRESET_THEMES.get(self.global_preset_style, {})
-            if theme_data:
-                # 根据控件类型获取对应的样式数据
-                control_type = self.dragging_control_type
-                preset_data = theme_data.get(control_type, {})
-                if preset_data:
-                    if "bg_color" in preset_data:
-                        new_control.bg_color = QColor(preset_data["bg_color"])
-                    if "fg_color" in preset_data:
-                        new_control.fg_color = QColor(preset_data["fg_color"])
-                    if "font_size" in preset_data:
-                        new_control.font.setPointSize(preset_data["font_size"])
-                    if "bold" in preset_data:
-                        new_control.font.setBold(preset_data["bold"])
-                    if "visual_style" in preset_data:
-                        new_control.visual_style = preset_data["visual_style"]
-                    if "border_radius" in preset_data:
-                        new_control.border_radius = preset_data["border_radius"]
-                    if "border_width" in preset_data:
-                        new_control.border_width = preset_data["border_width"]
-                    if "border_color" in preset_data:
-                        new_control.border_color = QColor(preset_data["border_color"])
+            theme_style = UIControl.theme_style(self.global_preset_style, self.dragging_control_type)
+            if theme_style:
+                ThemeCompiler.apply_theme(new_control, theme_style, respect_custom=False)
         
         # 设置控件位置为相对于主窗口的坐标
         drop_pos = event.pos()
@@ -1156,8 +2142,8 @@ class DesignCanvas(QWidget):
         # 定义容器控件类型
         container_types = ["QTabWidget", "QTextEdit", "QListWidget", "QTableWidget", "QGroupBox", "QScrollArea", "QFrame"]
         
-        # 从后往前遍历（后创建的控件在上层）
-        for control in reversed(self.controls):
+        # 空间索引返回包含该点的控件（后创建的控件在上层，排在前面）
+        for control in self.controls_at(pos):
             if control.type in container_types:
                 # 使用辅助函数计算容器控件的绝对坐标（支持多层嵌套）
                 abs_rect = get_control_absolute_rect(control, self.main_window_props)
@@ -1201,11 +2187,9 @@ class DesignCanvas(QWidget):
         if not self.selected_control:
             QMessageBox.warning(self, "警告", "请先选中要删除的控件！")
             return
-        # 保存要删除的控件引用
-        control_to_delete = self.selected_control
-        
-        # 递归删除所有子控件
-        self.delete_control_recursive(control_to_delete)
+        # 递归删除所有选中的控件及其子控件（子控件随父容器删除）
+        for control_to_delete in self.selection_roots():
+            self.delete_control_recursive(control_to_delete)
         
         # 清空选中状态
         self.selected_control = None
@@ -1224,7 +2208,12 @@ class DesignCanvas(QWidget):
             control.parent.children.remove(control)
         
         # 从画布移除控件
-        control.widget.deleteLater()
+        if control.widget:
+            control.widget.deleteLater()
+        self.pending_widgets.pop(control.id, None)
+        self.remove_control_from_index(control)
+        if control in self.selected_controls:
+            self.selected_controls.remove(control)
         # 从列表移除
         if control in self.controls:
             self.controls.remove(control)
@@ -1272,28 +2261,9 @@ class DesignCanvas(QWidget):
             
             # 应用全局预设主题（如果启用）
             if self.global_use_style:
-                theme_data = UIControl.PRESET_THEMES.get(self.global_preset_style, {})
-                if theme_data:
-                    # 根据控件类型获取对应的样式数据
-                    control_type = source_control.type
-                    preset_data = theme_data.get(control_type, {})
-                    if preset_data:
-                        if "bg_color" in preset_data:
-                            new_control.bg_color = QColor(preset_data["bg_color"])
-                        if "fg_color" in preset_data:
-                            new_control.fg_color = QColor(preset_data["fg_color"])
-                        if "font_size" in preset_data:
-                            new_control.font.setPointSize(preset_data["font_size"])
-                        if "bold" in preset_data:
-                            new_control.font.setBold(preset_data["bold"])
-                        if "visual_style" in preset_data:
-                            new_control.visual_style = preset_data["visual_style"]
-                        if "border_radius" in preset_data:
-                            new_control.border_radius = preset_data["border_radius"]
-                        if "border_width" in preset_data:
-                            new_control.border_width = preset_data["border_width"]
-                        if "border_color" in preset_data:
-                            new_control.border_color = QColor(preset_data["border_color"])
+                theme_style = UIControl.theme_style(self.global_preset_style, source_control.type)
+                if theme_style:
+                    ThemeCompiler.apply_theme(new_control, theme_style, respect_custom=False)
             
             new_control.create_widget()
             self.controls.append(new_control)
@@ -1319,6 +2289,28 @@ class DesignCanvas(QWidget):
         copy_action.triggered.connect(lambda: self.copy_control_by_id(self.selected_control.id))
         menu.addAction(copy_action)
 
+        # 多选时的对齐、分布和统一尺寸
+        if self.is_multi_selection():
+            align_menu = menu.addMenu("对齐")
+            for text, mode in (("左对齐", "left"), ("水平居中", "h_center"), ("右对齐", "right"),
+                               ("顶端对齐", "top"), ("垂直居中", "v_center"), ("底端对齐", "bottom")):
+                action = QAction(text, self)
+                action.triggered.connect(lambda checked=False, mode=mode: self.align_selection(mode))
+                align_menu.addAction(action)
+
+            distribute_menu = menu.addMenu("分布")
+            distribute_menu.setEnabled(len(self.selection_roots()) >= 3)
+            for text, orientation in (("水平等间距", "horizontal"), ("垂直等间距", "vertical")):
+                action = QAction(text, self)
+                action.triggered.connect(lambda checked=False, orientation=orientation: self.distribute_selection(orientation))
+                distribute_menu.addAction(action)
+
+            match_menu = menu.addMenu("统一尺寸")
+            for text, mode in (("同宽", "width"), ("同高", "height"), ("同宽高", "both")):
+                action = QAction(text, self)
+                action.triggered.connect(lambda checked=False, mode=mode: self.match_selection_size(mode))
+                match_menu.addAction(action)
+
         # 添加宽高修改菜单
         if self.selected_control.parent:
             size_menu = menu.addMenu("宽高修改")
@@ -1357,9 +2349,8 @@ class DesignCanvas(QWidget):
         self.selected_control.rect.setWidth(parent_width)
         self.selected_control.rect.setHeight(parent_height)
         
-        # 更新widget
-        if self.selected_control.widget:
-            self.selected_control.widget.setGeometry(self.selected_control.rect)
+        # 更新widget（同时清除矩形缓存并更新空间索引）
+        self.selected_control.update_geometry()
         
         # 发送信号通知属性面板更新
         self.control_selected.emit(self.selected_control)
@@ -1384,9 +2375,8 @@ class DesignCanvas(QWidget):
         # 更新子控件的高度
         self.selected_control.rect.setHeight(parent_height)
         
-        # 更新widget
-        if self.selected_control.widget:
-            self.selected_control.widget.setGeometry(self.selected_control.rect)
+        # 更新widget（同时清除矩形缓存并更新空间索引）
+        self.selected_control.update_geometry()
         
         # 发送信号通知属性面板更新
         self.control_selected.emit(self.selected_control)
@@ -1411,9 +2401,8 @@ class DesignCanvas(QWidget):
         # 更新子控件的宽度
         self.selected_control.rect.setWidth(parent_width)
         
-        # 更新widget
-        if self.selected_control.widget:
-            self.selected_control.widget.setGeometry(self.selected_control.rect)
+        # 更新widget（同时清除矩形缓存并更新空间索引）
+        self.selected_control.update_geometry()
         
         # 发送信号通知属性面板更新
         self.control_selected.emit(self.selected_control)
@@ -1494,28 +2483,9 @@ class DesignCanvas(QWidget):
             
             # 应用全局预设主题（如果启用）
             if self.global_use_style:
-                theme_data = UIControl.PRESET_THEMES.get(self.global_preset_style, {})
-                if theme_data:
-                    # 根据控件类型获取对应的样式数据
-                    control_type = self.drawing_control_type
-                    preset_data = theme_data.get(control_type, {})
-                    if preset_data:
-                        if "bg_color" in preset_data:
-                            new_control.bg_color = QColor(preset_data["bg_color"])
-                        if "fg_color" in preset_data:
-                            new_control.fg_color = QColor(preset_data["fg_color"])
-                        if "font_size" in preset_data:
-                            new_control.font.setPointSize(preset_data["font_size"])
-                        if "bold" in preset_data:
-                            new_control.font.setBold(preset_data["bold"])
-                        if "visual_style" in preset_data:
-                            new_control.visual_style = preset_data["visual_style"]
-                        if "border_radius" in preset_data:
-                            new_control.border_radius = preset_data["border_radius"]
-                        if "border_width" in preset_data:
-                            new_control.border_width = preset_data["border_width"]
-                        if "border_color" in preset_data:
-                            new_control.border_color = QColor(preset_data["border_color"])
+                theme_style = UIControl.theme_style(self.global_preset_style, self.drawing_control_type)
+                if theme_style:
+                    ThemeCompiler.apply_theme(new_control, theme_style, respect_custom=False)
             
             # 如果是QTabWidget，记录所在的标签页索引
             if parent_control.type == "QTabWidget" and parent_control.widget:
@@ -1555,28 +2525,9 @@ class DesignCanvas(QWidget):
             
             # 应用全局预设主题（如果启用）
             if self.global_use_style:
-                theme_data = UIControl.PRESET_THEMES.get(self.global_preset_style, {})
-                if theme_data:
-                    # 根据控件类型获取对应的样式数据
-                    control_type = self.drawing_control_type
-                    preset_data = theme_data.get(control_type, {})
-                    if preset_data:
-                        if "bg_color" in preset_data:
-                            new_control.bg_color = QColor(preset_data["bg_color"])
-                        if "fg_color" in preset_data:
-                            new_control.fg_color = QColor(preset_data["fg_color"])
-                        if "font_size" in preset_data:
-                            new_control.font.setPointSize(preset_data["font_size"])
-                        if "bold" in preset_data:
-                            new_control.font.setBold(preset_data["bold"])
-                        if "visual_style" in preset_data:
-                            new_control.visual_style = preset_data["visual_style"]
-                        if "border_radius" in preset_data:
-                            new_control.border_radius = preset_data["border_radius"]
-                        if "border_width" in preset_data:
-                            new_control.border_width = preset_data["border_width"]
-                        if "border_color" in preset_data:
-                            new_control.border_color = QColor(preset_data["border_color"])
+                theme_style = UIControl.theme_style(self.global_preset_style, self.drawing_control_type)
+                if theme_style:
+                    ThemeCompiler.apply_theme(new_control, theme_style, respect_custom=False)
             
             self.main_window_control.children.append(new_control)
         
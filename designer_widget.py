@@ -1,16 +1,17 @@
 import sys
 import os
 import html
-from project_manager import ProjectManager
+from project_manager import ProjectManager, ProjectLoadSession
+from project_worker import ProjectSaveWorker, ProjectLoadWorker
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QGroupBox, QPushButton, QLabel,
     QLineEdit, QTextEdit, QColorDialog, QVBoxLayout, QHBoxLayout,
     QSplitter, QMenuBar, QAction, QMessageBox, QInputDialog,
     QCheckBox, QRadioButton, QDialog, QScrollArea, QComboBox, QListWidget,
     QAbstractItemView, QTableWidget, QTableWidgetItem, QFileDialog, QTabWidget,
-    QSlider, QFrame
+    QSlider, QFrame, QProgressBar
 )
-from PyQt5.QtCore import Qt, QLocale, QTranslator, QLibraryInfo, QRect, pyqtSignal
+from PyQt5.QtCore import Qt, QLocale, QTranslator, QLibraryInfo, QRect, pyqtSignal, QThreadPool
 from PyQt5.QtGui import QColor, QFont, QTextOption, QFontMetrics
 
 from ui_control import UIControl
@@ -29,6 +30,7 @@ class DesignerWidget(QMainWindow):
     # 信号定义
     status_message_changed = pyqtSignal(str)  # 状态栏消息信号
     project_saved = pyqtSignal()  # 项目保存信号
+    project_loaded = pyqtSignal(bool)  # 后台加载完成信号（是否成功）
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -36,6 +38,10 @@ class DesignerWidget(QMainWindow):
         self.setWindowFlags(Qt.Widget)
         
         self.current_project_path = None
+        self._project_worker = None  # 正在运行的后台保存/加载任务
+        self._load_session = None
+        self._save_state = None  # 磁盘上项目的已保存状态，用于增量保存
+        self._save_state_path = None  # _save_state 对应的项目文件
         self.init_ui()
         # 移除自身的状态栏创建，改为发送信号给主窗口（如果需要统一状态栏）
         # 或者保留自身状态栏（QMainWindow作为子控件时，自身状态栏显示在底部）
@@ -128,12 +134,106 @@ class DesignerWidget(QMainWindow):
         """创建状态栏"""
         self.status_bar = self.statusBar()
         self.status_bar.showMessage("就绪")
+
+        # 后台保存/加载进度条（空闲时隐藏）
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setMaximumHeight(16)
+        self.progress_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.progress_bar)
     
     def update_status(self, message):
         """更新状态栏消息"""
         self.status_bar.showMessage(message)
         self.status_message_changed.emit(message) # 同时发送信号
 
+    def on_project_progress(self, message, percent):
+        """后台任务进度更新"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(percent)
+        self.status_bar.showMessage(f"{message} {percent}%")
+
+    def is_project_busy(self):
+        """是否有后台保存/加载任务正在运行"""
+        return self._project_worker is not None
+
+    def start_project_worker(self, worker):
+        """在全局线程池中启动后台任务"""
+        self._project_worker = worker # 保持引用，防止信号对象被回收
+        worker.signals.progress.connect(self.on_project_progress)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def finish_project_worker(self):
+        """后台任务结束，隐藏进度条"""
+        self._project_worker = None
+        self.progress_bar.setVisible(False)
+
+    def load_project_async(self, file_path):
+        """后台加载项目：解析在线程池中进行，控件按批在GUI线程中创建"""
+        if self.is_project_busy():
+            return False
+        self.current_project_path = file_path
+        self._load_session = ProjectLoadSession(self.design_canvas, lazy=True) # Widget可见时再创建
+
+        worker = ProjectLoadWorker(file_path)
+        worker.signals.records_ready.connect(self.on_project_records_ready)
+        worker.signals.finished.connect(self.on_project_load_finished)
+        self.start_project_worker(worker)
+        return True
+
+    def on_project_records_ready(self, records):
+        """收到一批解析好的记录，创建对应控件"""
+        if self._load_session is None:
+            return
+        # 只在处理每一批记录时暂停重绘，批次之间画布照常刷新，已加载的控件逐步显示出来
+        self.design_canvas.setUpdatesEnabled(False)
+        try:
+            for key, value in records:
+                self._load_session.apply_record(key, value)
+        finally:
+            self.design_canvas.setUpdatesEnabled(True)
+        self.design_canvas.schedule_materialize()
+
+    def on_project_load_finished(self, success):
+        """后台加载结束"""
+        session = self._load_session
+        self._load_session = None
+        self.finish_project_worker()
+        if session is None:
+            return
+        session.finish()
+        if success:
+            self.reset_save_state(self.current_project_path, session.journal_entries)
+            self.property_panel.set_main_window(self.design_canvas.main_window_props)
+            self.update_status(f"已打开项目: {self.current_project_path}")
+        else:
+            # 画布上只有部分控件，不再关联原文件，避免保存时用残缺的项目覆盖它
+            self.current_project_path = None
+            self._save_state = None
+            self._save_state_path = None
+            self.update_status("项目加载失败")
+        self.project_loaded.emit(success)
+
+    def reset_save_state(self, file_path, journal_entries=0):
+        """以当前画布作为已保存状态（项目加载后调用），之后的保存只追加差异
+
+        Args:
+            journal_entries: 加载时读到的增量日志条目数（日志已在加载时修复，这里不再重新读取）
+        """
+        project_data = ProjectManager.build_project_data(self.design_canvas)
+        self._save_state = ProjectManager.build_save_state(project_data)
+        self._save_state_path = file_path
+        self._save_state["journal_entries"] = journal_entries
+
+    def cancel_project_task(self):
+        """取消正在进行的后台加载（保存任务会继续写完，避免留下半个文件）"""
+        if isinstance(self._project_worker, ProjectLoadWorker):
+            self._project_worker.cancel()
+        self._load_session = None
+
     def create_menu(self):
         """创建菜单栏"""
         menu_bar = self.menuBar() # 获取QMainWindow自带的MenuBar
@@ -208,6 +308,7 @@ class DesignerWidget(QMainWindow):
         """控件层级选中事件：同步到画布"""
         control = self.design_canvas.get_control_by_id(control_id)
         if control:
+            self.design_canvas.materialize_control(control) # 确保延迟创建的Widget已存在
             self.design_canvas.selected_control = control
             self.design_canvas.main_window_selected_flag = False
             self.design_canvas.update_control_list()
@@ -710,10 +811,15 @@ class DesignerWidget(QMainWindow):
         """新建项目初始化"""
         self.design_canvas.clear_canvas()
         self.current_project_path = None
+        self._save_state = None
         self.update_status("新建项目")
 
     def save_project(self):
         """保存项目"""
+        if self.is_project_busy():
+            self.update_status("正在处理项目，请稍后再保存")
+            return
+
         if not self.current_project_path:
             # 默认保存到 projects 目录
             default_dir = os.path.join(os.getcwd(), "projects")
@@ -729,18 +835,49 @@ class DesignerWidget(QMainWindow):
 
             # 如果是新项目，需要另存为
             file_path, _ = QFileDialog.getSaveFileName(
-                self, "保存项目", default_path, "项目文件 (*.pack);;JSON文件 (*.json)"
+                self, "保存项目", default_path, "项目文件 (*.pack);;紧凑项目文件 (*.easyb);;JSON文件 (*.json)"
             )
             if not file_path:
                 return
             
             # 确保有后缀
-            if not file_path.endswith('.pack') and not file_path.endswith('.json'):
+            if not file_path.endswith(('.pack', '.json', '.easyb')):
                 file_path += '.pack'
         else:
             file_path = self.current_project_path
-            
-        if ProjectManager.save_project(file_path, self.design_canvas):
+
+        # 在GUI线程中生成数据快照，序列化和写盘交给后台线程
+        try:
+            project_data = ProjectManager.build_project_data(self.design_canvas)
+            journal_entry = None
+            if (self._save_state is not None and file_path == self._save_state_path
+                    and os.path.exists(file_path)
+                    and not ProjectManager.should_compact_journal(file_path, self._save_state)):
+                # 增量保存：只把与上次保存相比的差异追加到日志
+                journal_entry, save_state = ProjectManager.build_journal_entry(self._save_state, project_data)
+                if journal_entry is None:
+                    self.update_status(f"项目没有修改: {file_path}")
+                    return
+            else:
+                # 完整保存（同时合并并清除日志）
+                save_state = ProjectManager.build_save_state(project_data)
+        except Exception as e:
+            print(f"保存项目失败: {e}")
+            QMessageBox.critical(self, "错误", "项目保存失败！")
+            return
+
+        worker = ProjectSaveWorker(file_path, project_data, journal_entry)
+        worker.signals.finished.connect(
+            lambda success, path=file_path, state=save_state: self.on_project_save_finished(success, path, state)
+        )
+        self.start_project_worker(worker)
+
+    def on_project_save_finished(self, success, file_path, save_state=None):
+        """后台保存结束"""
+        self.finish_project_worker()
+        if success:
+            self._save_state = save_state
+            self._save_state_path = file_path
             self.current_project_path = file_path
             self.update_status(f"项目已保存: {file_path}")
             QMessageBox.information(self, "成功", "项目保存成功！")
@@ -748,6 +885,7 @@ class DesignerWidget(QMainWindow):
             # 通知主窗口更新列表
             self.project_saved.emit()
         else:
+            self.update_status("项目保存失败")
             QMessageBox.critical(self, "错误", "项目保存失败！")
 
     def generate_code_to_file(self):
@@ -232,8 +232,8 @@ class HomePanel(QWidget):
         if not folder_path or not os.path.exists(folder_path):
             return
 
-        # 扫描该文件夹下的.pack文件
-        files = [f for f in os.listdir(folder_path) if f.endswith('.pack')]
+        # 扫描该文件夹下的.pack/.easyb文件
+        files = [f for f in os.listdir(folder_path) if f.endswith(('.pack', '.easyb'))]
         # 按修改时间排序
         files.sort(key=lambda x: os.path.getmtime(os.path.join(folder_path, x)), reverse=True)
         
@@ -244,7 +244,7 @@ class HomePanel(QWidget):
         
         for f in files:
             full_path = os.path.join(folder_path, f)
-            file_name = f.replace('.pack', '')
+            file_name = os.path.splitext(f)[0]
             
             # 生成随机颜色或固定颜色
             import random
@@ -305,6 +305,10 @@ class HomePanel(QWidget):
         if reply == QMessageBox.Yes:
             try:
                 os.remove(file_path)
+                ProjectManager.discard_journal(file_path) # 同时删除增量日志和备份
+                backup_path = file_path + ProjectManager.BACKUP_SUFFIX
+                if os.path.exists(backup_path):
+                    os.remove(backup_path)
                 # 刷新列表
                 # 获取当前选中的文件夹
                 current_item = self.project_list.currentItem()
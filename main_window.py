@@ -9,6 +9,7 @@ from PyQt5.QtGui import QIcon
 from home_panel import HomePanel
 from designer_widget import DesignerWidget
 from project_manager import ProjectManager
+from theme_packs import ThemeRegistry
 
 class UnifiedMainWindow(QMainWindow):
     """统一的主窗口，包含选项卡界面"""
@@ -16,6 +17,9 @@ class UnifiedMainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("月初UI - 设计器--测试--绿泡泡:qycl96888")
         self.resize(1350, 1000)
+
+        # 加载 themes 目录中的主题包并开始监视（修改后自动重新加载）
+        ThemeRegistry.instance()
         
         # 初始化UI
         self.init_ui()
@@ -354,24 +358,30 @@ class UnifiedMainWindow(QMainWindow):
         # 创建设计器
         designer = DesignerWidget()
         
+        # 连接保存信号
+        designer.project_saved.connect(self.home_panel.load_projects)
+        designer.project_saved.connect(self.update_tab_title)
+        designer.project_loaded.connect(self.on_project_loaded)
+        
+        # 获取文件名作为标题
+        file_name = os.path.basename(file_path).replace('.pack', '').replace('.easyb', '').replace('.json', '')
+        index = self.tab_widget.addTab(designer, file_name)
+        self.tab_widget.setCurrentIndex(index)
+
         # 加载项目
-        # 修正：支持.pack文件
-        if ProjectManager.load_project(file_path, designer.design_canvas):
-            designer.current_project_path = file_path
-            designer.property_panel.set_main_window(designer.design_canvas.main_window_props)
-            designer.update_status(f"已打开项目: {file_path}")
-            
-            # 连接保存信号
-            designer.project_saved.connect(self.home_panel.load_projects)
-            designer.project_saved.connect(self.update_tab_title)
-            
-            # 获取文件名作为标题
-            file_name = os.path.basename(file_path).replace('.pack', '').replace('.json', '')
-            index = self.tab_widget.addTab(designer, file_name)
-            self.tab_widget.setCurrentIndex(index)
-        else:
-            QMessageBox.critical(self, "错误", "项目文件加载失败！")
-            designer.deleteLater()
+        # 修正：支持.pack文件；在后台线程中解析，加载期间界面保持响应
+        designer.load_project_async(file_path)
+
+    def on_project_loaded(self, success):
+        """后台加载结束，失败时关闭对应Tab"""
+        designer = self.sender()
+        if success or not isinstance(designer, DesignerWidget):
+            return
+        index = self.tab_widget.indexOf(designer)
+        if index != -1:
+            self.tab_widget.removeTab(index)
+        designer.deleteLater()
+        QMessageBox.critical(self, "错误", "项目文件加载失败！")
 
     def close_tab(self, index):
         """关闭Tab"""
@@ -385,7 +395,7 @@ class UnifiedMainWindow(QMainWindow):
         if isinstance(widget, DesignerWidget):
             # 这里可以添加保存提示逻辑
             # reply = QMessageBox.question(...)
-            pass
+            widget.cancel_project_task() # 停止尚未完成的后台加载
             
         self.tab_widget.removeTab(index)
         widget.deleteLater()
@@ -401,7 +411,7 @@ class UnifiedMainWindow(QMainWindow):
         
         index = self.tab_widget.indexOf(designer)
         if index != -1:
-            file_name = os.path.basename(designer.current_project_path).replace('.pack', '').replace('.json', '')
+            file_name = os.path.basename(designer.current_project_path).replace('.pack', '').replace('.easyb', '').replace('.json', '')
             self.tab_widget.setTabText(index, file_name)
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+import json
+import struct
+import zlib
+
+
+class CompactProjectFormat:
+    """紧凑项目格式（.easyb）：二进制文件头 + 共享键表 + 按类型字段模式 + 默认值省略 + zlib压缩
+
+    文件结构:
+        MAGIC_HEADER(7字节) + 格式版本(1字节) + 解压后长度(4字节, 小端) + zlib压缩的数据体
+    数据体（无缩进的JSON，由C实现的json模块解析）:
+        {
+            "version": 项目版本,
+            "main_window": 主窗口属性,
+            "keys": [所有控件字段名],                       # 共享键表
+            "types": [[类型名, [字段下标...], [默认值...]]],  # 每种控件类型的字段模式
+            "controls": [[类型下标, 字段位置, 值, 字段位置, 值, ...]]  # 只记录与默认值不同的字段
+        }
+    控件字典本身缺少某个字段（稀疏字典）时，记录为负的字段位置 -(位置+1)，不带值
+    """
+
+    EXTENSION = ".easyb"
+    MAGIC_HEADER = b"EASYBIN"
+    FORMAT_VERSION = 1
+    _HEADER = struct.Struct("<BI")  # 格式版本, 解压后长度
+    COMPRESS_LEVEL = 6
+
+    @staticmethod
+    def is_compact(head):
+        """根据文件开头的字节判断是否为紧凑格式"""
+        return head.startswith(CompactProjectFormat.MAGIC_HEADER)
+
+    @staticmethod
+    def _value_token(value):
+        """生成用于统计出现次数的可哈希标记（列表/字典等转为JSON文本）"""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, sort_keys=True, ensure_ascii=False)
+        return (type(value).__name__, value)
+
+    @staticmethod
+    def _build_schema(controls):
+        """为每种控件类型生成字段模式，默认值取该类型中出现次数最多的值"""
+        schemas = {}  # 类型名 -> {字段名: {标记: [次数, 值]}}
+        for control_data in controls:
+            counters = schemas.setdefault(control_data.get("type"), {})
+            for key, value in control_data.items():
+                counter = counters.setdefault(key, {})
+                token = CompactProjectFormat._value_token(value)
+                entry = counter.get(token)
+                if entry is None:
+                    counter[token] = [1, value]
+                else:
+                    entry[0] += 1
+
+        result = {}
+        for control_type, counters in schemas.items():
+            fields = list(counters)
+            defaults = [max(counters[key].values(), key=lambda entry: entry[0])[1] for key in fields]
+            result[control_type] = (fields, defaults)
+        return result
+
+    @staticmethod
+    def encode(project_data):
+        """将项目字典编码为紧凑格式的字节串"""
+        controls = project_data.get("controls", [])
+        schema = CompactProjectFormat._build_schema(controls)
+
+        keys = []
+        key_index = {}
+        types = []
+        type_index = {}
+        for control_type, (fields, defaults) in schema.items():
+            for key in fields:
+                if key not in key_index:
+                    key_index[key] = len(keys)
+                    keys.append(key)
+            type_index[control_type] = (len(types), {key: pos for pos, key in enumerate(fields)}, defaults)
+            types.append([control_type, [key_index[key] for key in fields], defaults])
+
+        packed_controls = []
+        for control_data in controls:
+            index, positions, defaults = type_index[control_data.get("type")]
+            row = [index]
+            for key, value in control_data.items():
+                pos = positions[key]
+                if value != defaults[pos] or type(value) is not type(defaults[pos]):
+                    row.append(pos)
+                    row.append(value)
+            if len(control_data) < len(positions):
+                for key, pos in positions.items():
+                    if key not in control_data:
+                        row.append(-pos - 1)
+            packed_controls.append(row)
+
+        payload = {
+            "version": project_data.get("version", "1.0"),
+            "main_window": project_data.get("main_window", {}),
+            "keys": keys,
+            "types": types,
+            "controls": packed_controls,
+        }
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return (CompactProjectFormat.MAGIC_HEADER
+                + CompactProjectFormat._HEADER.pack(CompactProjectFormat.FORMAT_VERSION, len(body))
+                + zlib.compress(body, CompactProjectFormat.COMPRESS_LEVEL))
+
+    @staticmethod
+    def decode(data):
+        """将紧凑格式的字节串解码为项目字典（结构与JSON项目文件相同）"""
+        magic_len = len(CompactProjectFormat.MAGIC_HEADER)
+        if not CompactProjectFormat.is_compact(data):
+            raise ValueError("不是紧凑格式的项目文件")
+        header_end = magic_len + CompactProjectFormat._HEADER.size
+        if len(data) < header_end:
+            raise ValueError("紧凑格式文件头不完整")
+        version, body_len = CompactProjectFormat._HEADER.unpack_from(data, magic_len)
+        if version > CompactProjectFormat.FORMAT_VERSION:
+            raise ValueError(f"不支持的紧凑格式版本: {version}")
+
+        body = zlib.decompress(data[header_end:])
+        if len(body) != body_len:
+            raise ValueError("紧凑格式数据长度不匹配")
+        payload = json.loads(body.decode("utf-8"))
+
+        keys = payload.get("keys", [])
+        types = []
+        for control_type, field_indexes, defaults in payload.get("types", []):
+            fields = [keys[i] for i in field_indexes]
+            # 默认值中的列表/字典需要为每个控件单独复制，避免多个控件共用同一个对象
+            # 预先序列化为一段JSON文本，每个控件用一次json.loads复制（比deepcopy快得多）
+            mutable = {key: value for key, value in zip(fields, defaults) if isinstance(value, (list, dict))}
+            mutable_text = json.dumps(mutable, ensure_ascii=False) if mutable else None
+            types.append((fields, dict(zip(fields, defaults)), mutable_text))
+
+        controls = []
+        for row in payload.get("controls", []):
+            fields, base, mutable_text = types[row[0]]
+            control_data = dict(base)
+            if mutable_text:
+                control_data.update(json.loads(mutable_text))
+            i = 1
+            row_len = len(row)
+            while i < row_len:
+                pos = row[i]
+                if pos < 0:
+                    control_data.pop(fields[-pos - 1], None)
+                    i += 1
+                else:
+                    control_data[fields[pos]] = row[i + 1]
+                    i += 2
+            controls.append(control_data)
+
+        return {
+            "version": payload.get("version", "1.0"),
+            "main_window": payload.get("main_window", {}),
+            "controls": controls,
+        }
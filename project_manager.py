@@ -1,6 +1,128 @@
+import os
+import re
+import copy
 import json
+import codecs
+import shutil
+import struct
+import tempfile
+from contextlib import contextmanager
 from ui_control import UIControl
 from main_window_props import MainWindowProperties
+from project_compact import CompactProjectFormat
+
+
+class ProjectStreamParser:
+    """增量解析项目JSON：逐条产出顶层字段，"controls" 数组中的控件逐个产出，
+    无需先构建完整的数据树"""
+
+    WHITESPACE = " \t\r\n"
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.state = "start"
+        self.current_key = None
+
+    def _skip_whitespace(self):
+        """跳过空白字符，返回下一个字符（缓冲区不足时返回None）"""
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+            self.pos += 1
+        if self.pos < len(self.buffer):
+            return self.buffer[self.pos]
+        return None
+
+    def _decode_value(self, eof):
+        """尝试从当前位置解析一个完整的JSON值，数据不完整时返回 (False, None)"""
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            return False, None
+        # 数字可能被截断在缓冲区末尾，需等待后续数据确认
+        if end >= len(self.buffer) and not eof:
+            return False, None
+        self.pos = end
+        return True, value
+
+    def feed(self, text, eof=False):
+        """追加文本并返回本次可解析出的记录列表 [(key, value), ...]
+        控件记录的key为 "control"
+        """
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        records = []
+
+        while self.state != "done":
+            char = self._skip_whitespace()
+            if char is None:
+                break
+
+            if self.state == "start":
+                if char != "{":
+                    raise ValueError(f"项目文件格式错误：期望 '{{'，实际为 {char!r}")
+                self.pos += 1
+                self.state = "key_or_end"
+            elif self.state in ("key_or_end", "key"):
+                if char == "}" and self.state == "key_or_end":
+                    self.pos += 1
+                    self.state = "done"
+                    continue
+                if char != '"':
+                    raise ValueError(f"项目文件格式错误：期望字段名，实际为 {char!r}")
+                ok, key = self._decode_value(eof)
+                if not ok:
+                    break
+                self.current_key = key
+                self.state = "colon"
+            elif self.state == "colon":
+                if char != ":":
+                    raise ValueError(f"项目文件格式错误：期望 ':'，实际为 {char!r}")
+                self.pos += 1
+                self.state = "value"
+            elif self.state == "value":
+                if self.current_key == "controls" and char == "[":
+                    self.pos += 1
+                    self.state = "control_or_end"
+                    continue
+                ok, value = self._decode_value(eof)
+                if not ok:
+                    break
+                records.append((self.current_key, value))
+                self.state = "comma_or_end"
+            elif self.state == "comma_or_end":
+                self.pos += 1
+                if char == ",":
+                    self.state = "key"
+                elif char == "}":
+                    self.state = "done"
+                else:
+                    raise ValueError(f"项目文件格式错误：期望 ',' 或 '}}'，实际为 {char!r}")
+            elif self.state in ("control_or_end", "control"):
+                if char == "]" and self.state == "control_or_end":
+                    self.pos += 1
+                    self.state = "comma_or_end"
+                    continue
+                ok, value = self._decode_value(eof)
+                if not ok:
+                    break
+                records.append(("control", value))
+                self.state = "control_comma"
+            elif self.state == "control_comma":
+                self.pos += 1
+                if char == ",":
+                    self.state = "control"
+                elif char == "]":
+                    self.state = "comma_or_end"
+                else:
+                    raise ValueError(f"项目文件格式错误：期望 ',' 或 ']'，实际为 {char!r}")
+
+        if eof and self.state != "done":
+            raise ValueError("项目文件不完整")
+        return records
+
 
 class ProjectManager:
     """项目管理器：负责项目的保存和加载"""
@@ -8,143 +130,685 @@ class ProjectManager:
     # 加密配置
     ENCRYPTION_KEY = b"EasyUI_Secure_Key_2024" # 密钥
     MAGIC_HEADER = b"EASYPACK_V1" # 文件头标识
+    CIPHER_CHUNK_SIZE = 1024 * 1024 # 批量加解密的分块大小（会按密钥长度对齐）
+
+    # 增量保存日志配置
+    JOURNAL_SUFFIX = ".journal" # 日志文件与项目文件同目录，文件名追加该后缀
+    JOURNAL_MAX_ENTRIES = 32 # 日志条数达到该值时合并为完整快照
+    JOURNAL_MAX_RATIO = 0.5 # 日志体积超过快照体积的该比例时合并为完整快照
+    _JOURNAL_FRAME = struct.Struct("<I") # 每条日志前的长度字段
+
+    BACKUP_SUFFIX = ".bak" # 覆盖保存前保留上一版本，文件名追加该后缀
+
+    # 编码检测配置
+    TEXT_ENCODING = "utf-8" # 新保存的JSON文件使用的编码，同时写入 "encoding" 字段
+    LEGACY_ENCODINGS = ["utf-8", "gbk", "gb2312", "utf-16", "latin1"] # 检测失败时依次尝试
+    ENCODING_SAMPLE_SIZE = 64 * 1024 # 启发式检测只解码这么多字节
+    ENCODING_MARKER_SCAN = 256 # 在文件开头这么多字节内查找编码标记
+    _BOMS = [
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF32_LE, "utf-32"),
+        (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    ]
+    _ENCODING_MARKER = re.compile(rb'^\s*\{\s*"encoding"\s*:\s*"([A-Za-z0-9_\-]+)"')
+    _NON_ASCII = re.compile(rb"[\x80-\xff]")
 
     @staticmethod
     def _xor_cipher(data, key):
-        """简单的XOR加解密"""
+        """简单的XOR加解密（按块整体运算，结果与逐字节XOR完全一致）"""
+        data_len = len(data)
         key_len = len(key)
-        result = bytearray(len(data))
-        for i in range(len(data)):
-            result[i] = data[i] ^ key[i % key_len]
-        return bytes(result)
+        if data_len == 0 or key_len == 0:
+            return bytes(data)
+
+        # 块大小取密钥长度的整数倍，保证每一块都从密钥第0个字节开始
+        chunk_size = max(key_len, ProjectManager.CIPHER_CHUNK_SIZE // key_len * key_len)
+        chunk_size = min(chunk_size, -(-data_len // key_len) * key_len)
+        key_stream = key * (chunk_size // key_len)
+        key_int = int.from_bytes(key_stream, "little")
+
+        view = memoryview(data)
+        chunks = []
+        for start in range(0, data_len, chunk_size):
+            block = view[start:start + chunk_size]
+            block_len = len(block)
+            if block_len == chunk_size:
+                block_key = key_int
+            else:
+                block_key = int.from_bytes(key_stream[:block_len], "little")
+            # 将整块数据视为一个大整数，一次XOR完成
+            value = int.from_bytes(block, "little") ^ block_key
+            chunks.append(value.to_bytes(block_len, "little"))
+        return b"".join(chunks)
 
     @staticmethod
-    def save_project(file_path, design_canvas):
-        """保存项目到文件（支持加密）"""
-        project_data = {
-            "version": "1.0",
-            "main_window": design_canvas.main_window_props.to_dict(),
-            "controls": [control.to_dict() for control in design_canvas.controls]
+    def _aligned_chunk_size(chunk_size=None):
+        """读写分块大小，按密钥长度对齐，保证每块都从密钥起点开始加解密"""
+        key_len = len(ProjectManager.ENCRYPTION_KEY)
+        chunk_size = chunk_size or ProjectManager.CIPHER_CHUNK_SIZE
+        return max(key_len, chunk_size // key_len * key_len)
+
+    @staticmethod
+    def build_project_data(design_canvas):
+        """生成项目数据快照（需在GUI线程中调用）
+
+        to_dict 直接返回控件的列表字段（events、list_items、table_data等），快照中复制一份，
+        后台线程序列化时界面仍可修改控件
+        """
+        return {
+            "version": "1.1", # 1.1起控件字段使用稀疏格式，省略与默认值相同的字段
+            "main_window": ProjectManager._detach(design_canvas.main_window_props.to_dict()),
+            "controls": [ProjectManager._detach(control.to_dict(sparse=True)) for control in design_canvas.controls]
         }
-        
+
+    @staticmethod
+    def _detach(data):
+        """复制字典中的列表和字典值，使快照不与控件共享可变对象"""
+        return {key: copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+                for key, value in data.items()}
+
+    @staticmethod
+    def write_project_data(file_path, project_data, progress_callback=None):
+        """将项目数据快照写入文件（不访问任何Qt对象，可在后台线程中调用）
+
+        Args:
+            file_path: 目标文件路径，.pack 后缀时加密，.easyb 后缀时使用紧凑格式
+            project_data: build_project_data 生成的字典
+            progress_callback: 每写入一块回调一次，参数为 (已写入字节数, 总字节数)
+        """
         try:
-            # 1. 转为JSON字符串
+            if file_path.endswith(CompactProjectFormat.EXTENSION):
+                # 紧凑格式：键表 + 默认值省略 + 压缩
+                data_bytes = CompactProjectFormat.encode(project_data)
+                with ProjectManager._atomic_open(file_path, "wb") as f:
+                    ProjectManager._write_bytes(f, data_bytes, progress_callback)
+                ProjectManager.discard_journal(file_path)
+                return True
+
+            # 1. 转为JSON字符串（普通JSON文件开头写入编码标记，加载时无需检测）
+            if not file_path.endswith(".pack"):
+                project_data = {"encoding": ProjectManager.TEXT_ENCODING, **project_data}
             json_str = json.dumps(project_data, indent=4, ensure_ascii=False)
+            chunk_size = ProjectManager._aligned_chunk_size()
             
             # 2. 决定是否加密：如果是 .pack 后缀则加密
             if file_path.endswith(".pack"):
                 # 转为bytes
                 data_bytes = json_str.encode("utf-8")
-                # 加密
-                encrypted_data = ProjectManager._xor_cipher(data_bytes, ProjectManager.ENCRYPTION_KEY)
-                # 写入：头标识 + 加密数据
-                with open(file_path, "wb") as f:
-                    f.write(ProjectManager.MAGIC_HEADER + encrypted_data)
+                total = len(data_bytes)
+                # 写入：头标识 + 分块加密的数据
+                with ProjectManager._atomic_open(file_path, "wb") as f:
+                    f.write(ProjectManager.MAGIC_HEADER)
+                    for start in range(0, total, chunk_size):
+                        block = data_bytes[start:start + chunk_size]
+                        f.write(ProjectManager._xor_cipher(block, ProjectManager.ENCRYPTION_KEY))
+                        if progress_callback:
+                            progress_callback(start + len(block), total)
             else:
                 # 普通JSON保存
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(json_str)
-                    
+                total = len(json_str)
+                with ProjectManager._atomic_open(file_path, "w", encoding=ProjectManager.TEXT_ENCODING) as f:
+                    for start in range(0, total, chunk_size):
+                        f.write(json_str[start:start + chunk_size])
+                        if progress_callback:
+                            progress_callback(min(start + chunk_size, total), total)
+
+            # 完整快照已包含所有修改，旧日志作废
+            ProjectManager.discard_journal(file_path)
             return True
         except Exception as e:
             print(f"保存项目失败: {e}")
             return False
 
     @staticmethod
-    def load_project(file_path, design_canvas):
-        """从文件加载项目（支持解密）"""
+    def _write_bytes(f, data_bytes, progress_callback=None):
+        """分块写入字节数据并回调进度"""
+        chunk_size = ProjectManager._aligned_chunk_size()
+        total = len(data_bytes)
+        for start in range(0, total, chunk_size):
+            f.write(data_bytes[start:start + chunk_size])
+            if progress_callback:
+                progress_callback(min(start + chunk_size, total), total)
+
+    @staticmethod
+    @contextmanager
+    def _atomic_open(file_path, mode, encoding=None):
+        """原子写入：先写同目录下的临时文件并fsync，成功后备份旧文件再重命名覆盖
+        写入过程中出错（崩溃、磁盘已满）时原文件保持不变，临时文件被删除"""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(file_path) + ".", suffix=".tmp", dir=directory)
         try:
-            content = ""
-            project_data = {}
-            
-            # 0. 检查文件大小
-            import os
-            if os.path.getsize(file_path) == 0:
-                print(f"文件为空，初始化空白项目: {file_path}")
-                project_data = {} 
+            with os.fdopen(fd, mode, encoding=encoding) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(file_path):
+                shutil.copymode(file_path, temp_path) # 保持原文件权限（mkstemp默认仅所有者可读写）
+                ProjectManager._make_backup(file_path)
             else:
-                # 1. 尝试以二进制读取并检查头标识
-                try:
-                    with open(file_path, "rb") as f:
-                        file_bytes = f.read()
-                    
-                    if file_bytes.startswith(ProjectManager.MAGIC_HEADER):
-                        # 是加密文件，进行解密
-                        encrypted_data = file_bytes[len(ProjectManager.MAGIC_HEADER):]
-                        decrypted_bytes = ProjectManager._xor_cipher(encrypted_data, ProjectManager.ENCRYPTION_KEY)
-                        content = decrypted_bytes.decode("utf-8")
-                    else:
-                        # 不是加密文件，尝试按文本解码
-                        # 尝试多种编码格式读取
-                        encodings = ["utf-8", "gbk", "gb2312", "utf-16", "latin1"]
-                        for encoding in encodings:
-                            try:
-                                content = file_bytes.decode(encoding)
-                                break
-                            except UnicodeDecodeError:
-                                continue
-                except Exception as e:
-                    print(f"读取文件失败: {e}")
-                
-                if content:
-                    try:
-                        project_data = json.loads(content)
-                    except json.JSONDecodeError:
-                        print(f"JSON解析失败，初始化空白项目: {file_path}")
-                        project_data = {}
-                else:
-                    print(f"无法读取文件内容，初始化空白项目: {file_path}")
-                    project_data = {}
+                os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        ProjectManager._fsync_directory(directory)
 
-            # 1. 清除现有画布
-            design_canvas.clear_canvas()
-            
-            # 2. 恢复主窗口属性
-            mw_data = project_data.get("main_window", {})
-            design_canvas.main_window_props = MainWindowProperties.from_dict(mw_data)
-            design_canvas.main_window_props.canvas = design_canvas
-            
-            # 3. 恢复控件
-            controls_data = project_data.get("controls", [])
-            controls_map = {} # id -> control
-            
-            # 第一遍：创建所有控件
-            for control_data in controls_data:
-                control = UIControl.from_dict(control_data, design_canvas)
-                controls_map[control.id] = control
-                design_canvas.controls.append(control)
-                control.create_widget() # 创建UI组件
-            
-            # 第二遍：建立父子关系
-            for control_data in controls_data:
-                control_id = control_data.get("id")
-                parent_id = control_data.get("parent_id")
-                
-                if control_id in controls_map:
-                    child = controls_map[control_id]
-                    
-                    if parent_id in controls_map:
-                        # 父控件是普通控件
-                        parent = controls_map[parent_id]
-                        child.parent = parent
-                        parent.children.append(child)
-                    else:
-                        # 父控件不在列表中（通常是主窗口），或者没有父控件
-                        # 将其挂载到主窗口下
-                        parent = design_canvas.main_window_control
-                        child.parent = parent
-                        parent.children.append(child)
-                        
-                    # 重新设置父组件
-                    child.attach_to_parent(parent)
-
-            # 更新画布
-            design_canvas.update()
-            design_canvas.update_control_list()
+    @staticmethod
+    def _make_backup(file_path):
+        """将当前文件保留为 .bak（优先硬链接，不支持时复制），原文件在重命名前一直可用"""
+        backup_path = file_path + ProjectManager.BACKUP_SUFFIX
+        temp_backup = backup_path + ".tmp"
+        if os.path.exists(temp_backup):
+            os.remove(temp_backup)
+        try:
+            os.link(file_path, temp_backup)
+        except OSError:
+            shutil.copy2(file_path, temp_backup)
+        os.replace(temp_backup, backup_path)
+
+    @staticmethod
+    def _fsync_directory(directory):
+        """同步目录项，保证重命名落盘（Windows不支持打开目录，忽略）"""
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+    @staticmethod
+    def save_project(file_path, design_canvas):
+        """保存项目到文件（支持加密）"""
+        try:
+            project_data = ProjectManager.build_project_data(design_canvas)
+        except Exception as e:
+            print(f"保存项目失败: {e}")
+            return False
+        return ProjectManager.write_project_data(file_path, project_data)
+
+    @staticmethod
+    def journal_path(file_path):
+        """项目文件对应的增量日志路径"""
+        return file_path + ProjectManager.JOURNAL_SUFFIX
+
+    @staticmethod
+    def _snapshot_signature(file_path):
+        """快照文件签名（大小 + 修改时间），用于判断日志是否属于当前快照"""
+        stat = os.stat(file_path)
+        return {"snapshot_size": stat.st_size, "snapshot_mtime_ns": stat.st_mtime_ns}
+
+    @staticmethod
+    def _encode_journal_record(file_path, record):
+        """编码一条日志：长度 + JSON（.pack 项目的日志同样加密）"""
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if file_path.endswith(".pack"):
+            payload = ProjectManager._xor_cipher(payload, ProjectManager.ENCRYPTION_KEY)
+        return ProjectManager._JOURNAL_FRAME.pack(len(payload)) + payload
+
+    @staticmethod
+    def build_save_state(project_data):
+        """记录已保存到磁盘的项目状态（每个控件一段JSON文本），用于下次保存时计算差异"""
+        return {
+            "main_window": json.dumps(project_data.get("main_window", {}), ensure_ascii=False, sort_keys=True),
+            "controls": {control_data["id"]: json.dumps(control_data, ensure_ascii=False, sort_keys=True)
+                         for control_data in project_data.get("controls", [])},
+            "journal_entries": 0,
+        }
+
+    @staticmethod
+    def build_journal_entry(save_state, project_data):
+        """对比已保存状态与当前项目数据，返回 (日志条目, 新状态)；没有修改时日志条目为 None"""
+        new_state = ProjectManager.build_save_state(project_data)
+        old_controls = save_state["controls"]
+        new_controls = new_state["controls"]
+        entry = {}
+
+        if new_state["main_window"] != save_state["main_window"]:
+            entry["main_window"] = project_data.get("main_window", {})
+
+        changed = [control_data for control_data in project_data.get("controls", [])
+                   if old_controls.get(control_data["id"]) != new_controls[control_data["id"]]]
+        if changed:
+            entry["controls"] = changed
+        deleted = [control_id for control_id in old_controls if control_id not in new_controls]
+        if deleted:
+            entry["deleted"] = deleted
+
+        # 回放时已有控件保持原位置、新控件追加到末尾；顺序与之不同时记录完整顺序
+        expected_order = [control_id for control_id in old_controls if control_id in new_controls]
+        expected_order.extend(control_id for control_id in new_controls if control_id not in old_controls)
+        if expected_order != list(new_controls):
+            entry["order"] = list(new_controls)
+
+        if not entry:
+            return None, save_state
+        new_state["journal_entries"] = save_state.get("journal_entries", 0) + 1
+        return entry, new_state
+
+    @staticmethod
+    def should_compact_journal(file_path, save_state):
+        """日志过长时应改为保存完整快照"""
+        if save_state.get("journal_entries", 0) >= ProjectManager.JOURNAL_MAX_ENTRIES:
+            return True
+        journal_file = ProjectManager.journal_path(file_path)
+        if not os.path.exists(journal_file):
+            return False
+        return os.path.getsize(journal_file) > os.path.getsize(file_path) * ProjectManager.JOURNAL_MAX_RATIO
+
+    @staticmethod
+    def append_journal_entry(file_path, entry):
+        """追加一条增量日志（不访问任何Qt对象，可在后台线程中调用）"""
+        try:
+            journal_file = ProjectManager.journal_path(file_path)
+            data = b""
+            if not os.path.exists(journal_file):
+                # 新日志先写入快照签名，快照被其他方式覆盖后日志自动失效
+                data = ProjectManager._encode_journal_record(file_path, ProjectManager._snapshot_signature(file_path))
+            data += ProjectManager._encode_journal_record(file_path, entry)
+            with open(journal_file, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            print(f"保存增量日志失败: {e}")
+            return False
+
+    @staticmethod
+    def read_journal(file_path, repair=False):
+        """读取属于当前快照的增量日志条目，日志不存在、已失效或损坏时返回空列表
+
+        Args:
+            repair: 末尾有不完整的记录时截掉，保证之后追加的日志可以被读取
+        """
+        journal_file = ProjectManager.journal_path(file_path)
+        if not os.path.exists(journal_file):
+            return []
+        try:
+            with open(journal_file, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"读取增量日志失败: {e}")
+            return []
+
+        records = []
+        frame_size = ProjectManager._JOURNAL_FRAME.size
+        pos = 0
+        while pos + frame_size <= len(data):
+            (length,) = ProjectManager._JOURNAL_FRAME.unpack_from(data, pos)
+            payload = data[pos + frame_size:pos + frame_size + length]
+            if len(payload) < length:
+                break # 最后一条写入不完整（如崩溃），忽略
+            if file_path.endswith(".pack"):
+                payload = ProjectManager._xor_cipher(payload, ProjectManager.ENCRYPTION_KEY)
+            try:
+                records.append(json.loads(payload.decode("utf-8")))
+            except ValueError:
+                break
+            pos += frame_size + length
+
+        if not records or records[0] != ProjectManager._snapshot_signature(file_path):
+            print(f"增量日志与项目文件不匹配，已忽略: {journal_file}")
+            if repair:
+                ProjectManager.discard_journal(file_path)
+            return []
+        if repair and pos < len(data):
+            with open(journal_file, "r+b") as f:
+                f.truncate(pos)
+        return records[1:]
+
+    @staticmethod
+    def discard_journal(file_path):
+        """删除增量日志"""
+        journal_file = ProjectManager.journal_path(file_path)
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+
+    @staticmethod
+    def apply_journal(project_data, entries):
+        """将增量日志按顺序回放到项目数据上"""
+        controls = {control_data["id"]: control_data for control_data in project_data.get("controls", [])}
+        main_window = project_data.get("main_window", {})
+        for entry in entries:
+            if "main_window" in entry:
+                main_window = entry["main_window"]
+            for control_id in entry.get("deleted", []):
+                controls.pop(control_id, None)
+            for control_data in entry.get("controls", []):
+                controls[control_data["id"]] = control_data # 已有控件原位替换，新控件追加
+            if "order" in entry:
+                controls = {control_id: controls[control_id] for control_id in entry["order"] if control_id in controls}
+        project_data["main_window"] = main_window
+        project_data["controls"] = list(controls.values())
+        return project_data
+
+    @staticmethod
+    def iter_project_records(file_path, chunk_size=None, progress_callback=None):
+        """流式读取项目文件，逐条产出 (key, value) 记录，控件记录的key为 "control"
+        加密文件按块解密，内存中只保留尚未解析完的一小段文本
+        有增量日志时先产出 ("journal_entries", 日志条目数)，日志末尾不完整的记录会被截掉
+
+        Args:
+            progress_callback: 每读取一块回调一次，参数为 (已读取字节数, 文件总字节数)
+        """
+        key = ProjectManager.ENCRYPTION_KEY
+        chunk_size = ProjectManager._aligned_chunk_size(chunk_size)
+        total = os.path.getsize(file_path)
+
+        entries = []
+        if os.path.exists(ProjectManager.journal_path(file_path)):
+            entries = ProjectManager.read_journal(file_path, repair=True)
+            yield "journal_entries", len(entries)
+        if entries:
+            # 有增量日志时需要先回放再创建控件，改为整体读取
+            project_data = ProjectManager.read_project_data(file_path, entries)
+            if progress_callback:
+                progress_callback(total, total)
+            yield "version", project_data.get("version", "1.0")
+            yield "main_window", project_data.get("main_window", {})
+            for control_data in project_data.get("controls", []):
+                yield "control", control_data
+            return
+
+        parser = ProjectStreamParser()
+        with open(file_path, "rb") as f:
+            head = f.read(len(ProjectManager.MAGIC_HEADER))
+            if CompactProjectFormat.is_compact(head):
+                # 紧凑格式整体压缩，体积很小，直接整体解码后逐条产出
+                project_data = CompactProjectFormat.decode(head + f.read())
+                if progress_callback:
+                    progress_callback(total, total)
+                yield "version", project_data["version"]
+                yield "main_window", project_data["main_window"]
+                for control_data in project_data["controls"]:
+                    yield "control", control_data
+                return
+
+            encrypted = head == ProjectManager.MAGIC_HEADER
+            if encrypted:
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                pending = b""
+            else:
+                # 按BOM选择解码器；无BOM时按UTF-8解码，失败由调用方回退到整体读取
+                encoding = ProjectManager._detect_bom(head) or "utf-8-sig"
+                decoder = codecs.getincrementaldecoder(encoding)()
+                pending = head
+
+            while True:
+                block = f.read(chunk_size)
+                eof = not block
+                if encrypted and block:
+                    block = ProjectManager._xor_cipher(block, key)
+                text = decoder.decode(pending + block, final=eof)
+                pending = b""
+                for record in parser.feed(text, eof):
+                    yield record
+                if progress_callback:
+                    progress_callback(f.tell(), total)
+                if eof:
+                    break
+
+    @staticmethod
+    def read_project_data(file_path, entries=None):
+        """整体读取项目文件并回放增量日志，失败时返回空字典
+
+        Args:
+            entries: 已读取的增量日志条目，为None时从日志文件读取
+        """
+        project_data = ProjectManager._read_snapshot_data(file_path)
+        if entries is None:
+            entries = ProjectManager.read_journal(file_path)
+        if entries and project_data:
+            ProjectManager.apply_journal(project_data, entries)
+        return project_data
+
+    @staticmethod
+    def _read_snapshot_data(file_path):
+        """整体读取项目快照文件并解析为字典（支持解密和多种编码），失败时返回空字典"""
+        content = ""
+        
+        # 0. 检查文件大小
+        if os.path.getsize(file_path) == 0:
+            print(f"文件为空，初始化空白项目: {file_path}")
+            return {}
+
+        # 1. 尝试以二进制读取并检查头标识
+        try:
+            with open(file_path, "rb") as f:
+                file_bytes = f.read()
             
+            if CompactProjectFormat.is_compact(file_bytes):
+                # 紧凑格式，直接解码为项目字典
+                return CompactProjectFormat.decode(file_bytes)
+            elif file_bytes.startswith(ProjectManager.MAGIC_HEADER):
+                # 是加密文件，进行解密
+                encrypted_data = file_bytes[len(ProjectManager.MAGIC_HEADER):]
+                decrypted_bytes = ProjectManager._xor_cipher(encrypted_data, ProjectManager.ENCRYPTION_KEY)
+                content = decrypted_bytes.decode("utf-8")
+            else:
+                # 不是加密文件，先检测编码再整体解码一次
+                content = ProjectManager.decode_text(file_bytes)
+        except Exception as e:
+            print(f"读取文件失败: {e}")
+        
+        if not content:
+            print(f"无法读取文件内容，初始化空白项目: {file_path}")
+            return {}
+
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            print(f"JSON解析失败，初始化空白项目: {file_path}")
+            return {}
+
+    @staticmethod
+    def _detect_bom(data):
+        """根据BOM判断编码，没有BOM时返回None"""
+        for bom, encoding in ProjectManager._BOMS:
+            if data.startswith(bom):
+                return encoding
+        return None
+
+    @staticmethod
+    def detect_encoding(file_bytes):
+        """单次检测文本编码：BOM -> 文件开头的编码标记 -> 有限长度样本的启发式判断"""
+        # 1. BOM
+        encoding = ProjectManager._detect_bom(file_bytes)
+        if encoding:
+            return encoding
+
+        # 2. 新版本保存的JSON文件开头带有 "encoding" 字段
+        match = ProjectManager._ENCODING_MARKER.match(file_bytes[:ProjectManager.ENCODING_MARKER_SCAN])
+        if match:
+            marker = match.group(1).decode("ascii")
+            try:
+                return codecs.lookup(marker).name
+            except LookupError:
+                pass
+
+        # 3. 无BOM的UTF-16：ASCII字符的高字节为0
+        head = file_bytes[:ProjectManager.ENCODING_MARKER_SCAN]
+        if head.count(0) > len(head) // 4:
+            return "utf-16-le" if head[1:2] == b"\x00" else "utf-16-be"
+
+        # 4. 从第一个非ASCII字节开始取有限长度样本，依次尝试UTF-8和GBK
+        first = ProjectManager._NON_ASCII.search(file_bytes)
+        if first is None:
+            return "utf-8" # 纯ASCII
+        sample = file_bytes[first.start():first.start() + ProjectManager.ENCODING_SAMPLE_SIZE]
+        for encoding in ("utf-8", "gbk"):
+            try:
+                # 增量解码允许样本末尾截断半个字符
+                codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        return "latin1"
+
+    @staticmethod
+    def decode_text(file_bytes):
+        """检测编码后解码一次；样本之外出现不符合的字节时，再按旧的编码列表依次尝试"""
+        encoding = ProjectManager.detect_encoding(file_bytes)
+        try:
+            return file_bytes.decode(encoding)
+        except UnicodeDecodeError:
+            print(f"按检测到的编码 {encoding} 解码失败，尝试其他编码")
+        for fallback in ProjectManager.LEGACY_ENCODINGS:
+            if codecs.lookup(fallback).name == codecs.lookup(encoding).name:
+                continue
+            try:
+                return file_bytes.decode(fallback)
+            except UnicodeDecodeError:
+                continue
+        return ""
+
+    @staticmethod
+    def _link_control(child, parent):
+        """建立父子关系并挂载Widget（如已挂在其他父控件下则先解除）"""
+        if child.parent is not parent:
+            if child.parent and child in child.parent.children:
+                child.parent.children.remove(child)
+            child.parent = parent
+            parent.children.append(child)
+        child.attach_to_parent(parent)
+
+    @staticmethod
+    def _apply_main_window(design_canvas, mw_data):
+        """恢复主窗口属性"""
+        design_canvas.main_window_props = MainWindowProperties.from_dict(mw_data)
+        design_canvas.main_window_props.canvas = design_canvas
+        design_canvas.update_canvas_size()
+
+    @staticmethod
+    def _load_project_streaming(file_path, design_canvas, progress_callback=None, lazy=False):
+        """流式加载：边读取边解析，每解析出一个控件立即创建"""
+        session = ProjectLoadSession(design_canvas, lazy)
+
+        if os.path.getsize(file_path) == 0:
+            print(f"文件为空，初始化空白项目: {file_path}")
+            session.finish()
+            return True
+
+        try:
+            for key, value in ProjectManager.iter_project_records(file_path):
+                session.apply_record(key, value)
+                if key == "control" and progress_callback:
+                    progress_callback(len(design_canvas.controls))
+        except UnicodeDecodeError:
+            # 非UTF-8编码的旧文件，回退到整体读取
+            print(f"文件不是UTF-8编码，改用整体读取: {file_path}")
+            return ProjectManager.load_project(file_path, design_canvas, lazy=lazy)
+        except ValueError as e:
+            # 文件被截断或损坏：不能当作加载成功，否则之后保存会用残缺的画布覆盖原文件
+            print(f"JSON解析中断，项目文件已损坏（已解析 {session.loaded_count} 个控件）: {e}")
+            return False
+
+        session.finish()
+        return True
+
+    @staticmethod
+    def load_project(file_path, design_canvas, streaming=False, progress_callback=None, lazy=False):
+        """从文件加载项目（支持解密，按文件头自动识别紧凑格式）
+
+        Args:
+            file_path: 项目文件路径
+            design_canvas: 目标画布
+            streaming: 是否使用流式加载（边解密边解析，峰值内存约为一份数据）
+            progress_callback: 流式加载时每创建一个控件回调一次，参数为已加载控件数
+            lazy: 只创建控件数据，Widget等控件可见或被选中时再创建
+        """
+        try:
+            if streaming:
+                return ProjectManager._load_project_streaming(file_path, design_canvas, progress_callback, lazy)
+
+            project_data = ProjectManager.read_project_data(file_path)
+
+            # 清除现有画布并恢复主窗口属性
+            session = ProjectLoadSession(design_canvas, lazy)
+            session.apply_record("main_window", project_data.get("main_window", {}))
+
+            # 恢复控件
+            for control_data in project_data.get("controls", []):
+                session.apply_record("control", control_data)
+
+            session.finish()
             return True
         except Exception as e:
             print(f"加载项目失败: {e}")
             import traceback
             traceback.print_exc()
             return False
+
+
+class ProjectLoadSession:
+    """按记录逐条恢复项目：创建控件并建立父子关系（需在GUI线程中调用）"""
+
+    def __init__(self, design_canvas, lazy=False):
+        self.design_canvas = design_canvas
+        self.lazy = lazy  # 为True时Widget延迟到可见时创建
+        self.journal_entries = 0  # 项目文件的增量日志条目数，用于之后的增量保存
+        self.reset()
+
+    def reset(self):
+        """清除现有画布，重新开始加载"""
+        self.controls_map = {}  # id -> control
+        self.waiting_children = {}  # 尚未出现的父控件id -> [子控件]
+        self.design_canvas.clear_canvas()
+        ProjectManager._apply_main_window(self.design_canvas, {})
+
+    @property
+    def loaded_count(self):
+        return len(self.controls_map)
+
+    def apply_record(self, key, value):
+        """应用一条记录：key为 "main_window" / "control" / "journal_entries" / "reset"，其他字段忽略"""
+        if key == "reset":
+            self.reset()
+        elif key == "journal_entries":
+            self.journal_entries = value
+        elif key == "main_window" and isinstance(value, dict):
+            ProjectManager._apply_main_window(self.design_canvas, value)
+        elif key == "control" and isinstance(value, dict):
+            self.add_control(value)
+
+    def add_control(self, control_data):
+        """创建一个控件并挂载到父控件"""
+        design_canvas = self.design_canvas
+        control = UIControl.from_dict(control_data, design_canvas)
+        self.controls_map[control.id] = control
+        design_canvas.controls.append(control)
+        if self.lazy:
+            design_canvas.defer_widget(control) # 可见时再创建UI组件
+        else:
+            control.create_widget() # 创建UI组件
+
+        # 父控件已加载则直接挂载；否则先挂到主窗口，待父控件出现后再移过去
+        # （顶层控件的parent_id是保存时主窗口的id，不会出现在控件列表中）
+        parent_id = control_data.get("parent_id")
+        if parent_id in self.controls_map:
+            ProjectManager._link_control(control, self.controls_map[parent_id])
+        else:
+            ProjectManager._link_control(control, design_canvas.main_window_control)
+            if parent_id:
+                self.waiting_children.setdefault(parent_id, []).append(control)
+
+        for child in self.waiting_children.pop(control.id, []):
+            ProjectManager._link_control(child, control)
+        return control
+
+    def finish(self):
+        """加载结束：刷新画布和控件列表"""
+        self.waiting_children.clear()
+        self.design_canvas.update_canvas_size()
+        self.design_canvas.apply_shared_styles()
+        if self.lazy:
+            self.design_canvas.schedule_materialize()
+        self.design_canvas.update()
+        self.design_canvas.update_control_list()
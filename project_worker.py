@@ -0,0 +1,99 @@
+import os
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from project_manager import ProjectManager
+
+
+class ProjectWorkerSignals(QObject):
+    """后台任务信号（QRunnable不能直接定义信号，跨线程自动排队到GUI线程）"""
+    progress = pyqtSignal(str, int)  # 状态文字, 进度百分比
+    records_ready = pyqtSignal(list)  # 一批解析好的 (key, value) 记录
+    finished = pyqtSignal(bool)  # 是否成功
+
+
+class ProjectSaveWorker(QRunnable):
+    """后台保存：序列化、加密和写盘都在线程池中完成"""
+
+    def __init__(self, file_path, project_data, journal_entry=None):
+        super().__init__()
+        self.file_path = file_path
+        self.project_data = project_data  # GUI线程中生成的快照，后台线程不再访问控件
+        self.journal_entry = journal_entry  # 不为None时只追加增量日志
+        self.signals = ProjectWorkerSignals()
+
+    def run(self):
+        self.signals.progress.emit("正在保存项目...", 0)
+        if self.journal_entry is not None:
+            success = ProjectManager.append_journal_entry(self.file_path, self.journal_entry)
+            self.signals.progress.emit("正在保存项目...", 100)
+        else:
+            success = ProjectManager.write_project_data(
+                self.file_path, self.project_data, self.on_progress
+            )
+        self.signals.finished.emit(success)
+
+    def on_progress(self, done, total):
+        percent = done * 100 // total if total else 100
+        self.signals.progress.emit("正在保存项目...", percent)
+
+
+class ProjectLoadWorker(QRunnable):
+    """后台加载：读取、解密和JSON解析在线程池中完成，按批把记录交给GUI线程创建控件"""
+
+    BATCH_SIZE = 100  # 每批记录数，越大GUI线程单次占用越久
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.cancelled = False
+        self.signals = ProjectWorkerSignals()
+        self._percent = -1
+
+    def cancel(self):
+        """取消加载（Tab被关闭时调用）"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            success = self.load_records()
+        except Exception as e:
+            print(f"加载项目失败: {e}")
+            success = False
+        self.signals.finished.emit(success and not self.cancelled)
+
+    def load_records(self):
+        """读取并分批发送记录，返回是否成功"""
+        self.signals.progress.emit("正在加载项目...", 0)
+        if os.path.getsize(self.file_path) == 0:
+            print(f"文件为空，初始化空白项目: {self.file_path}")
+            return True
+
+        batch = []
+        try:
+            for record in ProjectManager.iter_project_records(self.file_path, progress_callback=self.on_progress):
+                if self.cancelled:
+                    return False
+                batch.append(record)
+                if len(batch) >= self.BATCH_SIZE:
+                    self.signals.records_ready.emit(batch)
+                    batch = []
+        except UnicodeDecodeError:
+            # 非UTF-8编码的旧文件：丢弃已发送的记录，改用整体读取
+            print(f"文件不是UTF-8编码，改用整体读取: {self.file_path}")
+            project_data = ProjectManager.read_project_data(self.file_path)
+            batch = [("reset", None), ("main_window", project_data.get("main_window", {}))]
+            batch.extend(("control", data) for data in project_data.get("controls", []))
+        except ValueError as e:
+            # 文件被截断或损坏：按加载失败处理，不把残缺的画布当作已打开的项目
+            print(f"JSON解析中断，项目文件已损坏: {e}")
+            return False
+
+        if batch and not self.cancelled:
+            self.signals.records_ready.emit(batch)
+        return True
+
+    def on_progress(self, done, total):
+        percent = done * 100 // total if total else 100
+        if percent != self._percent:
+            self._percent = percent
+            self.signals.progress.emit("正在加载项目...", percent)
@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5.QtGui import QColor
 from ui_control import UIControl
+from theme_compiler import ThemeCompiler
+from theme_packs import ThemeRegistry
 from table_editor_dialog import TableEditorDialog
 from event_editor_dialog import EventEditorDialog
 from design_canvas import get_control_parent_bounds, get_control_absolute_rect
@@ -85,7 +87,9 @@ class PropertyPanel(QWidget):
         self.current_main_window = None
         self.control_hierarchy_panel = None
         self.updating_list_items = False
+        theme_registry = ThemeRegistry.instance()  # 先加载主题包，预设风格下拉框才包含主题包中的主题
         self.init_ui()
+        theme_registry.themes_changed.connect(self.refresh_theme_combos)
 
     def init_ui(self):
         """初始化界面"""
@@ -1863,8 +1867,8 @@ class PropertyPanel(QWidget):
             else:
                 content_width = self.current_control.parent_canvas.main_window_props.width
                 value = max(0, min(value, content_width - self.current_control.rect.width()))
-            self.current_control.rect.setX(value)
-            self.current_control.update_widget()
+            self.current_control.rect.moveLeft(value)
+            self.update_current_geometry()
 
     def on_y_changed(self, value):
         if self.current_control:
@@ -1876,8 +1880,8 @@ class PropertyPanel(QWidget):
             else:
                 content_height = self.current_control.parent_canvas.main_window_props.height  # height 本身就是内容区域高度，无需减去标题栏高度
                 value = max(0, min(value, content_height - self.current_control.rect.height()))
-            self.current_control.rect.setY(value)
-            self.current_control.update_widget()
+            self.current_control.rect.moveTop(value)
+            self.update_current_geometry()
 
     def on_w_changed(self, value):
         if self.current_control:
@@ -1890,7 +1894,7 @@ class PropertyPanel(QWidget):
                 content_width = self.current_control.parent_canvas.main_window_props.width
                 value = max(10, min(value, content_width - self.current_control.rect.x()))
             self.current_control.rect.setWidth(value)
-            self.current_control.update_widget()
+            self.update_current_geometry()
 
     def on_h_changed(self, value):
         if self.current_control:
@@ -1903,7 +1907,27 @@ class PropertyPanel(QWidget):
                 content_height = self.current_control.parent_canvas.main_window_props.height  # height 本身就是内容区域高度，无需减去标题栏高度
                 value = max(10, min(value, content_height - self.current_control.rect.y()))
             self.current_control.rect.setHeight(value)
-            self.current_control.update_widget()
+            self.update_current_geometry()
+
+    def update_current_geometry(self):
+        """位置/大小改变时只更新几何（不重新应用特有属性和样式表）"""
+        self.current_control.update_geometry()
+        self.current_control.parent_canvas.update_selection_overlay()
+
+    def refresh_theme_combos(self, changes=None):
+        """主题包重新加载后更新预设风格下拉框（保留当前选择），当前控件的样式可能已被画布重新应用，刷新显示"""
+        theme_names = list(UIControl.PRESET_THEMES.keys())
+        for combo in (self.preset_style_combo, self.mw_global_preset_style_combo):
+            if [combo.itemText(i) for i in range(combo.count())] == theme_names:
+                continue
+            current = combo.currentText()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems(theme_names)
+            combo.setCurrentText(current if current in theme_names else "自定义")
+            combo.blockSignals(False)
+        if changes and self.current_control and any(self.current_control.type in types for types in changes.values()):
+            self.set_control(self.current_control)
 
     def on_use_style_changed(self, use_style):
         if self.current_control:
@@ -1917,31 +1941,11 @@ class PropertyPanel(QWidget):
             self.current_control.preset_style = preset_name
             
             # 应用预设主题值（根据控件类型）
-            theme_data = UIControl.PRESET_THEMES.get(preset_name, {})
-            if theme_data:
-                # 根据控件类型获取对应的样式数据
-                control_type = self.current_control.type
-                style_data = theme_data.get(control_type, {})
-                if style_data:
-                    # 1. 颜色和字体
-                    if "bg_color" in style_data:
-                        self.current_control.bg_color = QColor(style_data["bg_color"])
-                    if "fg_color" in style_data:
-                        self.current_control.fg_color = QColor(style_data["fg_color"])
-                    if "font_size" in style_data:
-                        self.current_control.font.setPointSize(style_data["font_size"])
-                    if "bold" in style_data:
-                        self.current_control.font.setBold(style_data["bold"])
-                    
-                    # 2. 边框和视觉风格
-                    if "visual_style" in style_data:
-                        self.current_control.visual_style = style_data["visual_style"]
-                    if "border_radius" in style_data:
-                        self.current_control.border_radius = style_data["border_radius"]
-                    if "border_width" in style_data:
-                        self.current_control.border_width = style_data["border_width"]
-                    if "border_color" in style_data:
-                        self.current_control.border_color = QColor(style_data["border_color"])
+            if UIControl.PRESET_THEMES.get(preset_name):
+                # 根据控件类型获取对应的样式记录
+                theme_style = UIControl.theme_style(preset_name, self.current_control.type)
+                if theme_style:
+                    ThemeCompiler.apply_theme(self.current_control, theme_style, respect_custom=False)
 
                     # 更新UI显示
                     # 颜色按钮和标签
@@ -2208,18 +2212,28 @@ class PropertyPanel(QWidget):
     def on_mw_x_changed(self, value):
         if self.current_main_window:
             self.current_main_window.x = value
+            self.update_main_window_canvas_size()
 
     def on_mw_y_changed(self, value):
         if self.current_main_window:
             self.current_main_window.y = value
+            self.update_main_window_canvas_size()
 
     def on_mw_w_changed(self, value):
         if self.current_main_window:
             self.current_main_window.width = value
+            self.update_main_window_canvas_size()
 
     def on_mw_h_changed(self, value):
         if self.current_main_window:
             self.current_main_window.height = value
+            self.update_main_window_canvas_size()
+
+    def update_main_window_canvas_size(self):
+        """主窗口位置/大小改变后让画布按新的范围调整尺寸"""
+        canvas = self.current_main_window.canvas
+        if canvas:
+            canvas.update_canvas_size()
 
     def on_mw_bg_color_click(self):
         if not self.current_main_window:
@@ -2438,7 +2452,7 @@ class PropertyPanel(QWidget):
             self.current_control.rect.moveTo(local_pos)
             
         # 6. 更新显示
-        self.current_control.update_widget()
+        self.current_control.update_geometry()
         if hasattr(canvas, 'update_control_list'):
             canvas.update_control_list() # 刷新层级面板
         if hasattr(canvas, 'update_selection_overlay'):
@@ -0,0 +1,74 @@
+import re
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt
+
+
+class SharedStyleSheet:
+    """共享样式表：只使用预设样式值的控件不再各自 setStyleSheet，而是在共同祖先（画布）上
+    设置一份合并的样式表，每种样式生成一组用动态属性限定的规则，例如
+
+        QPushButton[designStyle="s3"]:hover { ... }
+        QTableWidget[designStyle="s7"] > QHeaderView::section { ... }
+
+    控件只需设置动态属性 designStyle 即可套用对应的规则，相同样式的控件只解析一次样式表。
+    """
+
+    PROPERTY_NAME = "designStyle"
+    _RULE_PATTERN = re.compile(r"([^{}]+)\{([^{}]*)\}")
+    _SELECTOR_PATTERN = re.compile(r"^(Q\w+)(.*)$", re.S)
+
+    def __init__(self, base_css=""):
+        self.base_css = base_css  # 画布自身的样式（不带选择器的声明）
+        self.classes = {}  # 样式键 -> 类名
+        self.stylesheet = self.compose([])
+
+    def class_for(self, key):
+        """返回样式键在当前共享样式表中的类名，尚未包含时返回 None"""
+        return self.classes.get(key)
+
+    def rebuild(self, controls):
+        """根据控件的当前样式重新生成共享样式表，返回新的样式表文本（未包含的旧样式会被移除）"""
+        classes = {}
+        rules = []
+        for control in controls:
+            key = control.style_key()
+            if key in classes:
+                continue
+            style_class = f"s{len(classes)}"
+            classes[key] = style_class
+            rules.append(self.scope_stylesheet(control.get_stylesheet(), control.type, style_class))
+        self.classes = classes
+        self.stylesheet = self.compose(rules)
+        return self.stylesheet
+
+    def compose(self, rules):
+        base = f"* {{ {self.base_css} }}\n" if self.base_css else ""
+        return base + "\n".join(rules)
+
+    @staticmethod
+    def scope_stylesheet(css, control_type, style_class):
+        """把单个控件的QSS改写为只作用于带有指定动态属性的控件（及其子部件）的规则"""
+        attribute = f'[{SharedStyleSheet.PROPERTY_NAME}="{style_class}"]'
+        scoped = []
+        for selectors, body in SharedStyleSheet._RULE_PATTERN.findall(css):
+            parts = []
+            for selector in selectors.split(","):
+                selector = selector.strip()
+                match = SharedStyleSheet._SELECTOR_PATTERN.match(selector)
+                if match and match.group(1) == control_type:
+                    # 控件自身（含伪状态和子控件），如 QPushButton:hover
+                    parts.append(f"{control_type}{attribute}{match.group(2)}")
+                else:
+                    # 直接子部件，如 QTableWidget 的 QHeaderView::section（不影响嵌套在内部的其他控件）
+                    parts.append(f"{control_type}{attribute} > {selector}")
+            scoped.append(f"{', '.join(parts)} {{{body}}}")
+        return "\n".join(scoped)
+
+    @staticmethod
+    def repolish(widget):
+        """动态属性改变后重新polish控件及其直接子部件，使属性选择器生效"""
+        for target in [widget] + widget.findChildren(QWidget, options=Qt.FindDirectChildrenOnly):
+            style = target.style()
+            style.unpolish(target)
+            style.polish(target)
+        widget.update()
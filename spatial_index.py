@@ -0,0 +1,164 @@
+from bisect import bisect_left
+
+
+class SpatialIndex:
+    """均匀网格空间索引：按矩形所覆盖的网格单元登记对象，支持点查询和区域查询
+
+    每个对象登记时分配一个递增序号，查询结果按序号从大到小返回（后登记的在上层），
+    更新已登记对象的矩形时保留原序号，因此层叠顺序不受移动/调整大小的影响。
+    """
+
+    CELL_SIZE = 128
+
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size or self.CELL_SIZE
+        self.cells = {}    # (列, 行) -> {key: 对象}
+        self.entries = {}  # key -> (对象, (x1, y1, x2, y2), 序号, 覆盖的网格范围)
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self._next_order = 0
+
+    def _cell_range(self, x1, y1, x2, y2):
+        size = self.cell_size
+        return x1 // size, y1 // size, x2 // size, y2 // size
+
+    def insert(self, key, item, rect):
+        """登记或更新对象的矩形（rect 为 QRect，宽高不大于0的矩形不参与查询）"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            order = entry[2]
+            self._unlink(key, entry[3])
+        else:
+            order = self._next_order
+            self._next_order += 1
+
+        if rect.width() <= 0 or rect.height() <= 0:
+            self.entries[key] = (item, None, order, None)
+            return
+        bounds = (rect.x(), rect.y(), rect.x() + rect.width() - 1, rect.y() + rect.height() - 1)
+        cell_range = self._cell_range(*bounds)
+        col1, row1, col2, row2 = cell_range
+        cells = self.cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                bucket = cells.get((col, row))
+                if bucket is None:
+                    cells[(col, row)] = {key: item}
+                else:
+                    bucket[key] = item
+        self.entries[key] = (item, bounds, order, cell_range)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._unlink(key, entry[3])
+
+    def _unlink(self, key, cell_range):
+        if cell_range is None:
+            return
+        col1, row1, col2, row2 = cell_range
+        cells = self.cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                bucket = cells.get((col, row))
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del cells[(col, row)]
+
+    def query_point(self, x, y):
+        """返回包含该点的对象列表，最上层的在前"""
+        size = self.cell_size
+        bucket = self.cells.get((x // size, y // size))
+        if not bucket:
+            return []
+        entries = self.entries
+        hits = []
+        for key in bucket:
+            _, (x1, y1, x2, y2), order, _ = entries[key]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                hits.append((order, key))
+        hits.sort(reverse=True)
+        return [entries[key][0] for _, key in hits]
+
+    def query_rect(self, rect):
+        """返回与矩形相交的对象列表，最上层的在前"""
+        if rect.width() <= 0 or rect.height() <= 0:
+            return []
+        qx1, qy1 = rect.x(), rect.y()
+        qx2, qy2 = qx1 + rect.width() - 1, qy1 + rect.height() - 1
+        col1, row1, col2, row2 = self._cell_range(qx1, qy1, qx2, qy2)
+        cells = self.cells
+        entries = self.entries
+        seen = set()
+        hits = []
+        if (col2 - col1 + 1) * (row2 - row1 + 1) > len(cells):
+            # 查询区域覆盖的网格比已占用的网格还多时，直接遍历已占用的网格
+            buckets = [bucket for (col, row), bucket in cells.items()
+                       if col1 <= col <= col2 and row1 <= row <= row2]
+        else:
+            buckets = [cells[(col, row)] for col in range(col1, col2 + 1)
+                       for row in range(row1, row2 + 1) if (col, row) in cells]
+        for bucket in buckets:
+            for key in bucket:
+                if key in seen:
+                    continue
+                seen.add(key)
+                _, (x1, y1, x2, y2), order, _ = entries[key]
+                if x1 <= qx2 and qx1 <= x2 and y1 <= qy2 and qy1 <= y2:
+                    hits.append((order, key))
+        hits.sort(reverse=True)
+        return [entries[key][0] for _, key in hits]
+
+
+class EdgeIndex:
+    """一维边线索引：按坐标排序的边线（左/中/右 或 上/中/下），用二分查找最近的边线
+
+    每条边线记录其在另一方向上的范围 (lo, hi)，用于绘制对齐参考线。
+    """
+
+    def __init__(self):
+        self._pending = []
+        self.values = []
+        self.spans = []
+
+    def add(self, value, lo, hi):
+        self._pending.append((value, lo, hi))
+
+    def build(self):
+        """添加完所有边线后排序"""
+        self._pending.sort()
+        self.values = [value for value, _, _ in self._pending]
+        self.spans = [(lo, hi) for _, lo, hi in self._pending]
+        self._pending = []
+        return self
+
+    def nearest(self, value, tolerance):
+        """返回距离 value 不超过 tolerance 的最近边线 (坐标, lo, hi)，同一坐标的多条边线合并范围"""
+        values = self.values
+        i = bisect_left(values, value)
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(values) and abs(values[j] - value) <= tolerance:
+                if best is None or abs(values[j] - value) < abs(values[best] - value):
+                    best = j
+        if best is None:
+            return None
+        target = values[best]
+        lo, hi = self.spans[best]
+        # 合并相同坐标的其他边线
+        k = bisect_left(values, target)
+        while k < len(values) and values[k] == target:
+            lo = min(lo, self.spans[k][0])
+            hi = max(hi, self.spans[k][1])
+            k += 1
+        return target, lo, hi
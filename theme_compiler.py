@@ -0,0 +1,89 @@
+from collections import namedtuple
+from PyQt5.QtGui import QColor
+
+
+# 主题中每种控件类型可以设置的样式字段
+THEME_STYLE_FIELDS = ("bg_color", "fg_color", "font_size", "bold",
+                      "visual_style", "border_radius", "border_width", "border_color")
+_COLOR_FIELDS = ("bg_color", "fg_color", "border_color")
+
+
+class ThemeStyle(namedtuple("ThemeStyle", THEME_STYLE_FIELDS)):
+    """编译后的单个控件类型的主题样式（只读记录），主题中未定义的字段为 None
+
+    颜色字段已解析为 QColor，应用到控件时复制一份，避免多个控件共用同一个可变对象。
+    """
+    __slots__ = ()
+
+
+class ThemeCompiler:
+    """把 PRESET_THEMES 形式的主题字典（十六进制颜色字符串）预编译为 {主题名: {控件类型: ThemeStyle}}"""
+
+    @staticmethod
+    def compile_style(style_data):
+        """编译单个控件类型的样式字典"""
+        values = {}
+        for field in THEME_STYLE_FIELDS:
+            value = style_data.get(field)
+            if value is not None and field in _COLOR_FIELDS:
+                value = QColor(value)
+            values[field] = value
+        return ThemeStyle(**values)
+
+    @staticmethod
+    def compile_themes(themes):
+        """编译全部主题，没有定义任何控件样式的主题（如"自定义"）编译为空表"""
+        return {
+            theme_name: {control_type: ThemeCompiler.compile_style(style_data)
+                         for control_type, style_data in theme_data.items() if style_data}
+            for theme_name, theme_data in themes.items()
+        }
+
+    @staticmethod
+    def diff_themes(old_themes, new_themes):
+        """比较两份编译后的主题表，返回 {主题名: 样式改变（新增、删除或修改）的控件类型集合}"""
+        changes = {}
+        for theme_name in old_themes.keys() | new_themes.keys():
+            old_styles = old_themes.get(theme_name, {})
+            new_styles = new_themes.get(theme_name, {})
+            changed_types = {control_type for control_type in old_styles.keys() | new_styles.keys()
+                             if old_styles.get(control_type) != new_styles.get(control_type)}
+            if changed_types:
+                changes[theme_name] = changed_types
+        return changes
+
+    @staticmethod
+    def apply_theme(control, record, respect_custom=True):
+        """把主题样式记录应用到控件的属性上（不刷新Widget），返回是否有属性改变
+
+        respect_custom 为 True 时跳过用户手动设置过的属性（control.custom_properties）
+        """
+        custom = control.custom_properties if respect_custom else ()
+        changed = False
+        font = control.font
+
+        if record.bg_color is not None and "bg_color" not in custom and control.bg_color != record.bg_color:
+            control.bg_color = QColor(record.bg_color)
+            changed = True
+        if record.fg_color is not None and "fg_color" not in custom and control.fg_color != record.fg_color:
+            control.fg_color = QColor(record.fg_color)
+            changed = True
+        if record.font_size is not None and "font_size" not in custom and font.pointSize() != record.font_size:
+            font.setPointSize(record.font_size)
+            changed = True
+        if record.bold is not None and "bold" not in custom and font.bold() != record.bold:
+            font.setBold(record.bold)
+            changed = True
+        if record.visual_style is not None and "visual_style" not in custom and control.visual_style != record.visual_style:
+            control.visual_style = record.visual_style
+            changed = True
+        if record.border_radius is not None and "border_radius" not in custom and control.border_radius != record.border_radius:
+            control.border_radius = record.border_radius
+            changed = True
+        if record.border_width is not None and "border_width" not in custom and control.border_width != record.border_width:
+            control.border_width = record.border_width
+            changed = True
+        if record.border_color is not None and "border_color" not in custom and control.border_color != record.border_color:
+            control.border_color = QColor(record.border_color)
+            changed = True
+        return changed
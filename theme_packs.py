@@ -0,0 +1,182 @@
+import os
+import json
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor
+from theme_compiler import THEME_STYLE_FIELDS
+from ui_control import UIControl
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    tomllib = None  # 低版本Python不支持TOML主题包，只加载JSON
+
+
+class ThemePackLoader:
+    """主题包文件（JSON/TOML）的读取与校验
+
+    主题包格式（JSON，TOML结构相同）:
+        {
+            "name": "企业蓝",                     # 主题名称，省略时使用文件名
+            "styles": {
+                "QPushButton": {"bg_color": "#1E40AF", "fg_color": "#FFFFFF", "font_size": 10, "bold": true,
+                                "visual_style": "圆角", "border_radius": 6, "border_width": 0,
+                                "border_color": "transparent"},
+                ...
+            }
+        }
+    每种控件类型的字段都是可选的，与 UIControl.PRESET_THEMES 中的字段相同
+    """
+
+    EXTENSIONS = (".json", ".toml")
+    CONTROL_TYPES = ("QPushButton", "QLabel", "QLineEdit", "QTextEdit", "QComboBox", "QListWidget",
+                     "QTableWidget", "QCheckBox", "QRadioButton", "QTabWidget", "QGroupBox", "QSlider",
+                     "QScrollArea", "QFrame")
+    VISUAL_STYLES = ("默认", "扁平", "圆角", "描边", "渐变")
+    MAX_VALUE = 200  # 字号、圆角半径、边框宽度的上限
+
+    @staticmethod
+    def is_theme_file(file_name):
+        return file_name.lower().endswith(ThemePackLoader.EXTENSIONS) and not file_name.startswith(".")
+
+    @staticmethod
+    def load_file(file_path):
+        """读取并校验一个主题包文件，返回 (主题名, 主题字典)，格式错误时抛出 ValueError"""
+        file_name = os.path.basename(file_path)
+        if file_path.lower().endswith(".toml"):
+            if tomllib is None:
+                raise ValueError(f"{file_name}: 当前Python版本不支持TOML主题包")
+            with open(file_path, "rb") as f:
+                try:
+                    data = tomllib.load(f)
+                except tomllib.TOMLDecodeError as e:
+                    raise ValueError(f"{file_name}: TOML格式错误: {e}")
+        else:
+            with open(file_path, "r", encoding="utf-8-sig") as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{file_name}: JSON格式错误: {e}")
+        return ThemePackLoader.validate(data, file_name)
+
+    @staticmethod
+    def validate(data, source):
+        """校验主题包内容，返回 (主题名, {控件类型: 样式字典})"""
+        if not isinstance(data, dict):
+            raise ValueError(f"{source}: 主题包必须是一个对象")
+        name = data.get("name", os.path.splitext(source)[0])
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"{source}: 主题名称无效")
+        styles = data.get("styles")
+        if not isinstance(styles, dict) or not styles:
+            raise ValueError(f"{source}: 缺少 styles 或 styles 为空")
+
+        theme_data = {}
+        for control_type, style in styles.items():
+            if control_type not in ThemePackLoader.CONTROL_TYPES:
+                raise ValueError(f"{source}: 未知的控件类型 {control_type}")
+            if not isinstance(style, dict):
+                raise ValueError(f"{source}: {control_type} 的样式必须是一个对象")
+            for field, value in style.items():
+                ThemePackLoader._validate_field(f"{source}: {control_type}.{field}", field, value)
+            theme_data[control_type] = dict(style)
+        return name.strip(), theme_data
+
+    @staticmethod
+    def _validate_field(where, field, value):
+        if field not in THEME_STYLE_FIELDS:
+            raise ValueError(f"{where}: 未知的样式字段")
+        if field in ("bg_color", "fg_color", "border_color"):
+            if not isinstance(value, str) or not QColor(value).isValid():
+                raise ValueError(f"{where}: 无效的颜色 {value!r}")
+        elif field == "bold":
+            if not isinstance(value, bool):
+                raise ValueError(f"{where}: 必须是 true 或 false")
+        elif field == "visual_style":
+            if value not in ThemePackLoader.VISUAL_STYLES:
+                raise ValueError(f"{where}: 必须是 {'/'.join(ThemePackLoader.VISUAL_STYLES)} 之一")
+        else:
+            # font_size / border_radius / border_width
+            minimum = 1 if field == "font_size" else 0
+            if isinstance(value, bool) or not isinstance(value, int) or not minimum <= value <= ThemePackLoader.MAX_VALUE:
+                raise ValueError(f"{where}: 必须是 {minimum}~{ThemePackLoader.MAX_VALUE} 之间的整数")
+
+
+class ThemeRegistry(QObject):
+    """主题包注册表：启动时加载 themes 目录中的主题包并监视该目录，
+    文件新增、修改或删除后重新加载，通知已打开的画布只重新应用样式改变的控件类型"""
+
+    themes_changed = pyqtSignal(dict)  # {主题名: 样式改变的控件类型集合}
+    THEME_DIR_NAME = "themes"
+    RELOAD_DELAY = 200  # 毫秒，合并编辑器保存时的多次文件变化
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """返回全局唯一的注册表（首次调用时加载主题包）"""
+        if cls._instance is None:
+            cls._instance = cls(os.path.join(os.getcwd(), cls.THEME_DIR_NAME))
+        return cls._instance
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.packs = {}  # 文件路径 -> (主题名, 主题字典)，文件出错时保留上一次成功加载的内容
+        self.errors = {}  # 文件路径 -> 错误信息（同一错误只提示一次）
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_reload)
+        self.watcher.fileChanged.connect(self.schedule_reload)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.RELOAD_DELAY)
+        self.reload_timer.timeout.connect(self.reload)
+
+        self.reload()
+
+    def schedule_reload(self, path=None):
+        self.reload_timer.start()
+
+    def theme_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if ThemePackLoader.is_theme_file(name))
+
+    def reload(self):
+        """重新加载全部主题包，更新 UIControl.PRESET_THEMES，有样式改变时发出 themes_changed"""
+        files = self.theme_files()
+        packs = {}
+        errors = {}
+        for file_path in files:
+            try:
+                packs[file_path] = ThemePackLoader.load_file(file_path)
+            except (OSError, ValueError) as e:
+                errors[file_path] = str(e)
+                if errors[file_path] != self.errors.get(file_path):
+                    print(f"[主题包] 加载失败，{'保留上次的内容' if file_path in self.packs else '已跳过'}: {e}")
+                if file_path in self.packs:
+                    packs[file_path] = self.packs[file_path]
+        self.packs = packs
+        self.errors = errors
+
+        themes = {}
+        for file_path, (name, theme_data) in packs.items():
+            if name in themes:
+                print(f"[主题包] 主题名称重复，{os.path.basename(file_path)} 覆盖了之前的 '{name}'")
+            themes[name] = theme_data
+        changes = UIControl.set_theme_packs(themes)
+
+        # 重新监视（编辑器保存时可能先删除再创建文件，原来的监视会失效）
+        if os.path.isdir(self.directory) and self.directory not in self.watcher.directories():
+            self.watcher.addPath(self.directory)
+        watched = set(self.watcher.files())
+        for file_path in watched - set(files):
+            self.watcher.removePath(file_path)
+        for file_path in set(files) - watched:
+            self.watcher.addPath(file_path)
+
+        if changes:
+            print(f"[主题包] 已重新加载 {len(themes)} 个主题包，样式改变: "
+                  + ", ".join(f"{name}({len(types)})" for name, types in changes.items()))
+            self.themes_changed.emit(changes)
@@ -1,4 +1,6 @@
+import json
 import uuid
+from collections import OrderedDict
 from PyQt5.QtWidgets import (
     QPushButton, QLabel, QLineEdit, QCheckBox, QRadioButton,
     QTextEdit, QComboBox, QListWidget, QTableWidget, QTableWidgetItem, QTabWidget, QWidget, QVBoxLayout,
@@ -6,6 +8,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QPoint, QRect, QEvent
 from PyQt5.QtGui import QColor, QFont, QCursor, QPalette
+from shared_stylesheet import SharedStyleSheet
+from theme_compiler import ThemeCompiler
 
 class DesignScrollArea(QScrollArea):
     """自定义滚动区域，用于显示'画布'文字"""
@@ -44,6 +48,18 @@ class DesignScrollArea(QScrollArea):
 class UIControl:
     """封装所有UI控件的属性和行为，统一管理"""
 
+    # 脏标记：修改属性后用 invalidate 标记受影响的部分，flush_updates 只刷新被标记的部分
+    DIRTY_GEOMETRY = 1    # 位置和大小（只需 setGeometry）
+    DIRTY_PROPERTIES = 2  # 通用属性、文本和控件特有属性（列表项、表格单元格等）
+    DIRTY_STYLE = 4       # QSS样式表或原生样式
+    DIRTY_ALL = DIRTY_GEOMETRY | DIRTY_PROPERTIES | DIRTY_STYLE
+
+    # QSS缓存：样式相关属性元组 -> 生成的QSS字符串（LRU），相同主题的控件共用同一个字符串
+    STYLESHEET_CACHE_SIZE = 512
+    _stylesheet_cache = OrderedDict()
+    stylesheet_cache_hits = 0
+    stylesheet_cache_misses = 0
+
     PRESET_THEMES = {
     "自定义": {},
     "现代简约": {
@@ -399,6 +415,52 @@ class UIControl:
     }
     }
     }
+    _compiled_themes = None  # PRESET_THEMES 预编译后的主题表（首次使用时生成，见 ThemeCompiler）
+    _builtin_themes = None  # 内置主题（加载主题包前的 PRESET_THEMES）
+
+    @classmethod
+    def theme_style(cls, theme_name, control_type):
+        """返回预编译的主题样式记录 ThemeStyle，主题或控件类型未定义样式时返回 None"""
+        if cls._compiled_themes is None:
+            cls._compiled_themes = ThemeCompiler.compile_themes(cls.PRESET_THEMES)
+        return cls._compiled_themes.get(theme_name, {}).get(control_type)
+
+    @classmethod
+    def set_theme_packs(cls, packs):
+        """用磁盘上的主题包 {主题名: 主题字典} 更新 PRESET_THEMES（就地更新，内置主题不会被覆盖），
+        返回 {主题名: 样式改变的控件类型集合}"""
+        if cls._builtin_themes is None:
+            cls._builtin_themes = dict(cls.PRESET_THEMES)
+        themes = dict(cls._builtin_themes)
+        for theme_name, theme_data in packs.items():
+            if theme_name in cls._builtin_themes:
+                print(f"[主题包] 不能覆盖内置主题 '{theme_name}'，已跳过")
+                continue
+            themes[theme_name] = theme_data
+
+        old_compiled = cls._compiled_themes
+        if old_compiled is None:
+            old_compiled = ThemeCompiler.compile_themes(cls.PRESET_THEMES)
+        cls.PRESET_THEMES.clear()
+        cls.PRESET_THEMES.update(themes)
+        cls._compiled_themes = ThemeCompiler.compile_themes(cls.PRESET_THEMES)
+        return ThemeCompiler.diff_themes(old_compiled, cls._compiled_themes)
+
+    # 稀疏序列化：始终写出的字段，其余字段与该类型默认值相同时省略
+    SPARSE_REQUIRED_KEYS = ("id", "type", "name", "parent_id")
+    _default_dicts = {}  # 控件类型 -> __init__ 默认值对应的完整字典（首次使用时生成）
+    _default_mutable_json = {}  # 控件类型 -> 默认值中列表/字典字段的JSON文本（用于快速复制）
+    
+    @classmethod
+    def get_default_dict(cls, control_type):
+        """获取指定类型控件的默认属性字典（与 __init__ 中的默认值一致，按类型缓存）"""
+        defaults = cls._default_dicts.get(control_type)
+        if defaults is None:
+            defaults = cls(control_type, None).to_dict()
+            cls._default_dicts[control_type] = defaults
+            mutable = {key: value for key, value in defaults.items() if isinstance(value, (list, dict))}
+            cls._default_mutable_json[control_type] = json.dumps(mutable, ensure_ascii=False)
+        return defaults
     
     @staticmethod
     def get_control_count(parent_canvas, control_type):
@@ -411,14 +473,11 @@ class UIControl:
                 count += 1
         return count
     
-    def __init__(self, control_type, parent_canvas):
+    def __init__(self, control_type, parent_canvas, name=None):
         # 基础属性
         self.id = str(uuid.uuid4())[:8]  # 唯一标识
         self.type = control_type  # 控件类型（QPushButton/QLabel等）
         
-        # 获取同类型控件数量
-        control_count = self.get_control_count(parent_canvas, control_type)
-        
         # 中文类型名称映射
         type_names = {
             "QPushButton": "按钮",
@@ -439,7 +498,11 @@ class UIControl:
         
         # 设置中文名称
         chinese_type = type_names.get(control_type, control_type)
-        self.name = f"{chinese_type}_{str(control_count + 1).zfill(3)}"  # 控件名称，如"按钮_001"
+        if name is None:
+            # 获取同类型控件数量（需遍历画布上所有控件，加载项目时由调用方直接传入名称跳过）
+            control_count = self.get_control_count(parent_canvas, control_type)
+            name = f"{chinese_type}_{str(control_count + 1).zfill(3)}"  # 控件名称，如"按钮_001"
+        self.name = name
         self.text = chinese_type  # 显示文本
         
         # 根据控件类型设置默认尺寸
@@ -560,6 +623,8 @@ class UIControl:
         self.parent = None  # 父控件（容器控件）
         self.parent_tab_index = -1 # 如果父控件是选项卡，记录所在的标签页索引
         self.children = []  # 子控件列表
+        self._local_rect_cache = None  # 相对于主窗口内容区域的矩形缓存（见 design_canvas.get_control_local_rect）
+        self.dirty_flags = 0  # 待刷新的部分（DIRTY_* 的组合）
 
     def create_widget(self):
         """创建画布上的预览控件"""
@@ -634,10 +699,27 @@ class UIControl:
         
         self.widget.mouseMoveEvent = lambda e: self.on_mouse_move(e)
 
+    def invalidate_rect_cache(self):
+        """清除本控件及子控件的矩形缓存（已缓存控件的祖先一定也已缓存，遇到未缓存的控件即可停止向下）"""
+        stack = [self]
+        while stack:
+            control = stack.pop()
+            if control._local_rect_cache is None and control is not self:
+                continue
+            control._local_rect_cache = None
+            stack.extend(control.children)
+
+    def notify_geometry_changed(self):
+        """通知画布本控件（及其子控件）的位置、大小或父容器已改变"""
+        self.invalidate_rect_cache()
+        if self.parent_canvas:
+            self.parent_canvas.invalidate_control_geometry(self)
+
     def attach_to_parent(self, parent_control):
         """将控件挂载到父控件上（包括逻辑关系和UI关系）"""
         if not parent_control:
             return
+        self.notify_geometry_changed()
 
         # 1. 建立逻辑关系（如果尚未建立）
         if self.parent != parent_control:
@@ -660,6 +742,9 @@ class UIControl:
             return
 
         # 常规处理：挂载到父控件的Widget上
+        if not parent_control.widget:
+            # 父容器的Widget被延迟创建时先创建它
+            self.parent_canvas.materialize_control(parent_control)
         if not parent_control.widget:
             return
 
@@ -691,11 +776,37 @@ class UIControl:
             self.widget.setGeometry(self.rect)
             self.widget.show()
 
+    def invalidate(self, flags):
+        """标记需要刷新的部分（DIRTY_* 的组合），由 flush_updates 统一应用"""
+        self.dirty_flags |= flags
+        if flags & self.DIRTY_GEOMETRY:
+            self.notify_geometry_changed()
+
+    def flush_updates(self):
+        """只刷新被标记为脏的部分：几何只调用 setGeometry，属性和样式各自独立"""
+        if not self.widget or not self.dirty_flags:
+            return
+        flags = self.dirty_flags
+        self.dirty_flags = 0
+        if flags & self.DIRTY_GEOMETRY:
+            self.apply_geometry()
+        if flags & self.DIRTY_PROPERTIES:
+            self.apply_properties()
+        if flags & self.DIRTY_STYLE:
+            self.apply_style()
+
     def update_widget(self):
         """更新控件样式和属性（仅更新样式和属性，不涉及位置和大小）"""
-        if not self.widget:
-            return
-        
+        self.invalidate(self.DIRTY_PROPERTIES | self.DIRTY_STYLE)
+        self.flush_updates()
+
+    def update_geometry(self):
+        """更新控件的位置和大小（不重新应用属性和样式）"""
+        self.invalidate(self.DIRTY_GEOMETRY)
+        self.flush_updates()
+
+    def apply_properties(self):
+        """应用通用属性、文本、滚动条和控件特有属性"""
         # 更新通用属性
         self.widget.setVisible(self.visible)
         self.widget.setEnabled(self.enabled)
@@ -704,24 +815,42 @@ class UIControl:
             self.widget.setCursor(QCursor(Qt.ForbiddenCursor))
         else:
             self.widget.setCursor(QCursor(Qt.PointingHandCursor))
+
+        # 更新文本
+        # 注意：对于复杂控件（如列表、表格、Tab），不直接设置text
+        if hasattr(self.widget, "setText") and self.type not in ["QListWidget", "QTableWidget", "QComboBox", "QTabWidget", "QTextEdit"]:
+             self.widget.setText(self.text)
+        elif hasattr(self.widget, "setPlaceholderText") and self.type not in ["QTextEdit"]: # QTextEdit handled in specific
+             self.widget.setPlaceholderText(self.text)
+
+        # 更新滚动条
+        if self.type in ["QScrollArea", "QTextEdit", "QListWidget", "QTableWidget", "QTreeWidget"]:
+            policy_h = Qt.ScrollBarAsNeeded if self.h_scrollbar else Qt.ScrollBarAlwaysOff
+            policy_v = Qt.ScrollBarAsNeeded if self.v_scrollbar else Qt.ScrollBarAlwaysOff
+            if hasattr(self.widget, "setHorizontalScrollBarPolicy"):
+                self.widget.setHorizontalScrollBarPolicy(policy_h)
+            if hasattr(self.widget, "setVerticalScrollBarPolicy"):
+                self.widget.setVerticalScrollBarPolicy(policy_v)
             
         # 更新控件特有属性 (Logic Properties)
         self.update_specific_properties()
 
-        # 更新样式 (Visual Style)
+        # 确保控件可见
+        self.widget.raise_()
+
+    def apply_style(self):
+        """应用视觉样式（QSS样式表或原生样式）"""
         if self.use_style:
             self.update_stylesheet()
         else:
             self.update_native_style()
-        
-        # 确保控件可见
-        self.widget.raise_()
-        
-    def update_geometry(self):
-        """更新控件的位置和大小"""
-        if not self.widget:
-            return
-            
+
+        # 特殊控件辅助组件更新
+        if self.type == "QScrollArea" and isinstance(self.widget, DesignScrollArea):
+            self.widget.update_style()
+
+    def apply_geometry(self):
+        """应用控件的位置和大小"""
         if self.parent and self.parent.type != "MainWindow":
             # 控件在普通父容器内
             content_rect = self.parent.get_content_rect()
@@ -746,31 +875,10 @@ class UIControl:
             # 没有父容器
             self.widget.setGeometry(self.rect)
 
-        # 特殊控件辅助组件更新
-        if self.type == "QScrollArea" and isinstance(self.widget, DesignScrollArea):
-            self.widget.update_style()
-
-        # 5. 更新文本和滚动条
-        # 注意：对于复杂控件（如列表、表格、Tab），不直接设置text
-        if hasattr(self.widget, "setText") and self.type not in ["QListWidget", "QTableWidget", "QComboBox", "QTabWidget", "QTextEdit"]:
-             self.widget.setText(self.text)
-        elif hasattr(self.widget, "setPlaceholderText") and self.type not in ["QTextEdit"]: # QTextEdit handled in specific
-             self.widget.setPlaceholderText(self.text)
-             
-        if self.parent_canvas:
-            self.parent_canvas.update()
-            
-        if self.type in ["QScrollArea", "QTextEdit", "QListWidget", "QTableWidget", "QTreeWidget"]:
-            policy_h = Qt.ScrollBarAsNeeded if self.h_scrollbar else Qt.ScrollBarAlwaysOff
-            policy_v = Qt.ScrollBarAsNeeded if self.v_scrollbar else Qt.ScrollBarAlwaysOff
-            if hasattr(self.widget, "setHorizontalScrollBarPolicy"):
-                self.widget.setHorizontalScrollBarPolicy(policy_h)
-            if hasattr(self.widget, "setVerticalScrollBarPolicy"):
-                self.widget.setVerticalScrollBarPolicy(policy_v)
-
     def update_native_style(self):
         """应用原生样式（字体、颜色、背景）"""
-        # 1. 清除样式表
+        # 1. 清除样式表（包括共享样式）
+        self.widget.setProperty(SharedStyleSheet.PROPERTY_NAME, None)
         self.widget.setStyleSheet("")
         
         # 2. 设置字体
@@ -986,7 +1094,43 @@ class UIControl:
             if isinstance(self.widget, DesignScrollArea):
                 self.widget.update_style()
 
+    def style_key(self):
+        """生成QSS所依赖的全部属性组成的元组（用作QSS缓存的键）"""
+        return (self.type, self.visual_style, self.bg_color.rgba(), self.fg_color.rgba(),
+                self.font.family(), self.font.pointSize(),
+                self.border_radius, self.border_width, self.border_color.rgba(),
+                bool(self.locked and self.show_bg_color))
+
+    @classmethod
+    def stylesheet_cache_info(cls):
+        """返回QSS缓存的命中次数、未命中次数和当前条目数"""
+        return {"hits": cls.stylesheet_cache_hits, "misses": cls.stylesheet_cache_misses,
+                "size": len(cls._stylesheet_cache)}
+
+    @classmethod
+    def clear_stylesheet_cache(cls):
+        cls._stylesheet_cache.clear()
+        cls.stylesheet_cache_hits = 0
+        cls.stylesheet_cache_misses = 0
+
     def get_stylesheet(self):
+        """获取QSS样式字符串（优先从缓存中取）"""
+        cache = UIControl._stylesheet_cache
+        key = self.style_key()
+        style_css = cache.get(key)
+        if style_css is not None:
+            cache.move_to_end(key)
+            UIControl.stylesheet_cache_hits += 1
+            return style_css
+
+        UIControl.stylesheet_cache_misses += 1
+        style_css = self.build_stylesheet()
+        cache[key] = style_css
+        if len(cache) > UIControl.STYLESHEET_CACHE_SIZE:
+            cache.popitem(last=False)
+        return style_css
+
+    def build_stylesheet(self):
         """生成QSS样式字符串"""
         # 基础颜色处理
         if self.locked and self.show_bg_color:
@@ -1443,11 +1587,31 @@ class UIControl:
         
         return style_css
 
+    def shared_style_class(self):
+        """只使用预设样式值（没有手动设置的属性）的控件返回其在画布共享样式表中的类名，否则返回 None"""
+        if self.custom_properties:
+            return None
+        shared_styles = getattr(self.parent_canvas, 'shared_styles', None)
+        if shared_styles is None:
+            return None
+        return shared_styles.class_for(self.style_key())
+
     def update_stylesheet(self):
-        """应用QSS样式"""
-        style_css = self.get_stylesheet()
-        if self.widget:
+        """应用QSS样式：优先使用画布的共享样式表，手动设置过属性的控件使用自己的样式表"""
+        if not self.widget:
+            return
+        property_name = SharedStyleSheet.PROPERTY_NAME
+        style_class = self.shared_style_class()
+        class_changed = self.widget.property(property_name) != style_class
+        if class_changed:
+            self.widget.setProperty(property_name, style_class)
+
+        style_css = "" if style_class is not None else self.get_stylesheet()
+        # 与控件当前的样式表相同时跳过，避免Qt重新解析样式表并重新polish
+        if self.widget.styleSheet() != style_css:
             self.widget.setStyleSheet(style_css)
+        elif class_changed:
+            SharedStyleSheet.repolish(self.widget)
 
     def get_content_rect(self):
         """获取控件的内容区域（相对于控件自身左上角）"""
@@ -1474,83 +1638,32 @@ class UIControl:
              return QRect(0, 0, self.rect.width(), self.rect.height())
 
     def on_mouse_press(self, event):
-        """鼠标按下：选中控件+记录拖拽起始位置"""
+        """鼠标按下：选中控件并开始拖动（与在选中框覆盖层上点击走同一流程）"""
         if self.locked:
             return
-        self.parent_canvas.selected_control = self
-        self.parent_canvas.main_window_selected_flag = False
-        
-        # 使用全局坐标记录起始点，避免控件移动导致的坐标系变化问题
-        self.parent_canvas.drag_start_global = event.globalPos()
-        self.parent_canvas.drag_start_rect = QRect(self.rect)
-        
-        self.parent_canvas.update_control_list()
-        self.parent_canvas.control_selected.emit(self)
-        self.parent_canvas.main_window_selected.emit(None)
-        self.parent_canvas.update_selection_overlay()
+        canvas_pos = self.parent_canvas.mapFromGlobal(event.globalPos())
+        self.parent_canvas.handle_control_click(self, canvas_pos, event.button(), event.modifiers())
 
     def on_mouse_move(self, event):
-        """鼠标移动：拖拽控件"""
+        """鼠标移动：拖拽控件（由画布合并到每帧处理，拖动中只移动虚影）"""
         if self.locked:
             return
         # 检查是否按住左键且当前控件被选中
         if self.parent_canvas.selected_control != self or event.buttons() != Qt.LeftButton:
             return
-            
-        # 确保有起始坐标记录
-        if not hasattr(self.parent_canvas, 'drag_start_global'):
+        if not self.parent_canvas.moving_control:
             return
-
-        # 计算全局偏移量
-        delta = event.globalPos() - self.parent_canvas.drag_start_global
-        
-        # 基于初始位置计算新位置
-        start_rect = self.parent_canvas.drag_start_rect
-        new_x = start_rect.x() + delta.x()
-        new_y = start_rect.y() + delta.y()
-        
-        if self.parent and self.parent.widget:
-            # 如果有父容器，限制在父容器的内容区域内部
-            content_rect = self.parent.get_content_rect()
-            
-            # 限制边界
-            min_x = content_rect.x()
-            min_y = 0  # 相对于父容器的内容区域，Y坐标从0开始
-            max_x = content_rect.width() - self.rect.width()
-            max_y = content_rect.height() - self.rect.height()
-            
-            new_x = max(min_x, min(new_x, max_x))
-            new_y = max(min_y, min(new_y, max_y))
-            
-            self.rect.moveTo(new_x, new_y)
-            # 如果是QTabWidget，需要转换坐标
-            if self.parent.type == "QTabWidget":
-                self.widget.move(new_x, new_y)
-            else:
-                self.widget.move(new_x, new_y)
-        else:
-            # 限制在主窗口内容区域内，加上标题栏高度
-            content_width = self.parent_canvas.main_window_props.width
-            content_height = self.parent_canvas.main_window_props.height + self.parent_canvas.main_window_props.title_height  # 加上标题栏高度
-            new_x = max(0, min(new_x, content_width - self.rect.width()))
-            new_y = max(0, min(new_y, content_height - self.rect.height()))
-            
-            self.rect.moveTo(new_x, new_y)
-            # 将相对坐标转换为绝对坐标来移动控件
-            abs_x = self.parent_canvas.main_window_props.x + self.rect.x()
-            abs_y = self.parent_canvas.main_window_props.y + self.parent_canvas.main_window_props.title_height + self.rect.y()
-            self.widget.move(abs_x, abs_y)
-            
-        self.parent_canvas.update_selection_overlay()
+        self.parent_canvas.queue_drag(self.parent_canvas.mapFromGlobal(event.globalPos()), event.modifiers())
 
     def on_mouse_release(self, event):
-        """鼠标释放：结束拖拽"""
-        if hasattr(self.parent_canvas, 'drag_start_global'):
-            del self.parent_canvas.drag_start_global
-        self.parent_canvas.control_selected.emit(self)
+        """鼠标释放：结束拖拽，提交控件位置"""
+        if self.parent_canvas.moving_control:
+            self.parent_canvas.finish_drag()
+        else:
+            self.parent_canvas.control_selected.emit(self)
 
-    def to_dict(self):
-        """序列化为字典"""
+    def to_dict(self, sparse=False):
+        """序列化为字典（sparse=True时只写出与该类型默认值不同的字段）"""
         data = {
             "id": self.id,
             "type": self.type,
@@ -1624,12 +1737,27 @@ class UIControl:
             "slider_value": self.slider_value,
             "slider_orientation": self.slider_orientation
         }
+        if sparse:
+            defaults = self.get_default_dict(self.type)
+            required = self.SPARSE_REQUIRED_KEYS
+            data = {key: value for key, value in data.items()
+                    if key in required or key not in defaults or defaults[key] != value}
+            data["sparse"] = True # 标记为稀疏字典，加载时省略的字段取类型默认值
         return data
 
     @classmethod
     def from_dict(cls, data, parent_canvas):
         """从字典反序列化"""
-        control = cls(data["type"], parent_canvas)
+        if data.get("sparse"):
+            # 稀疏字典：省略的字段用该类型默认值补齐
+            # 列表等可变值通过一次json.loads复制（比deepcopy快得多），避免控件间共用
+            full_data = dict(cls.get_default_dict(data["type"]))
+            full_data.update(json.loads(cls._default_mutable_json[data["type"]]))
+            full_data.update(data)
+            data = full_data
+
+        # 已保存的名称直接传入，避免为生成默认名称遍历画布（否则加载n个控件为O(n²)）
+        control = cls(data["type"], parent_canvas, name=data.get("name"))
         control.id = data.get("id", control.id)
         control.name = data.get("name", control.name)
         control.text = data.get("text", control.text)